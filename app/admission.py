@@ -0,0 +1,149 @@
+"""
+Admission control for expensive routes.
+
+Each limited route gets `max_concurrent` execution slots and a bounded FIFO wait queue.
+When the queue is full, or a queued request waits longer than `admission_queue_timeout_s`,
+the request is rejected immediately with `admission_reject_status` and a Retry-After header
+instead of piling up. Routes without a limiter (GET /tasks/{id}, /health, ...) are never
+queued, so cheap reads keep flowing while ingest/suggestions are saturated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+
+
+class RouteLimiter:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout_s: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the bounded queue if needed. False means: reject the request."""
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout_s)
+        except TimeoutError:
+            self.timed_out += 1
+            self.rejected += 1
+            return False
+        except BaseException:
+            # Client went away while queued; hand back a slot we may have been given meanwhile
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        # Hand the slot straight to the next waiter (FIFO) so newcomers cannot jump the queue
+        while self._waiters:
+            w = self._waiters.popleft()
+            if not w.done():
+                w.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+@dataclass(frozen=True)
+class Rule:
+    method: str
+    path: str
+    limiter: RouteLimiter
+
+
+def _default_rules() -> list[Rule]:
+    timeout = settings.admission_queue_timeout_s
+    ingest = RouteLimiter("ingest", settings.ingest_max_concurrent, settings.ingest_max_queue, timeout)
+    suggestions = RouteLimiter(
+        "suggestions", settings.suggestions_max_concurrent, settings.suggestions_max_queue, timeout
+    )
+    return [
+        Rule("POST", "/ingest", ingest),
+        Rule("GET", "/suggestions", suggestions),
+    ]
+
+
+rules = _default_rules()
+
+
+def limiter_stats() -> dict[str, dict]:
+    return {r.limiter.name: r.limiter.stats() for r in rules}
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    def _match(self, scope: Scope) -> RouteLimiter | None:
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        for r in rules:
+            if r.method == method and r.path == path:
+                return r.limiter
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        limiter = self._match(scope)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": f"Server busy ({limiter.name}); retry shortly"},
+                status_code=settings.admission_reject_status,
+                headers={"Retry-After": str(settings.admission_retry_after_s)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,210 @@
+"""
+Online SQLite backups.
+
+Uses SQLite's backup API. In WAL mode the copy runs inside one read transaction, so it sees a
+single consistent snapshot and concurrent commits neither block it nor restart it; it goes in
+`backup_pages_per_step` steps with a `backup_step_sleep_ms` pause after each, so the copy's I/O
+is spread out while the live service keeps reading and writing. In other journal modes a reader
+would block writers for the whole copy, so it is taken in one step instead.
+Snapshots are timestamped, optionally gzip-compressed and rotated to the newest
+`backup_keep` files.
+
+    python -m app.backup create [--dir backups] [--no-compress] [--keep 7]
+    python -m app.backup list [--dir backups]
+    python -m app.backup restore backups/taskdb-20250101-120000.sqlite.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from .config import settings
+
+_SUFFIXES = (".sqlite", ".sqlite.gz")
+
+
+@dataclass
+class BackupResult:
+    path: Path
+    size: int
+    pages: int
+    seconds: float
+    removed: list[Path]
+
+
+def database_path(url: str | None = None) -> Path:
+    """Filesystem path of the SQLite database behind `database_url`."""
+    u = make_url(url or settings.database_url)
+    if u.get_backend_name() != "sqlite" or not u.database or u.database == ":memory:":
+        raise ValueError(f"Online backup needs a file-based SQLite database, got {u.render_as_string()}")
+    return Path(u.database)
+
+
+def list_backups(backup_dir: str | Path | None = None) -> list[Path]:
+    """Snapshots in `backup_dir`, newest first."""
+    d = Path(backup_dir or settings.backup_dir)
+    if not d.is_dir():
+        return []
+    files = [p for p in d.iterdir() if p.is_file() and p.name.endswith(_SUFFIXES)]
+    return sorted(files, key=lambda p: p.name, reverse=True)
+
+
+def rotate(backup_dir: str | Path | None = None, keep: int | None = None) -> list[Path]:
+    keep = settings.backup_keep if keep is None else keep
+    if keep <= 0:
+        return []
+    stale = list_backups(backup_dir)[keep:]
+    for p in stale:
+        p.unlink(missing_ok=True)
+    return stale
+
+
+def _copy_online(src: sqlite3.Connection, dst: sqlite3.Connection, pages: int, sleep_ms: float) -> int:
+    total = 0
+    pause = max(sleep_ms, 0.0) / 1000.0
+
+    def progress(_status: int, remaining: int, page_count: int) -> None:
+        nonlocal total
+        total = page_count
+        # Called after each step; the backup API itself only sleeps when a step is BUSY/LOCKED
+        if remaining and pause:
+            time.sleep(pause)
+
+    wal = src.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+    if not wal:
+        src.backup(dst, pages=-1, progress=progress)
+        return total
+    # Pin one snapshot for the whole copy: without an open read transaction every step takes a
+    # fresh one, and any commit in between restarts the backup from page 1
+    src.execute("BEGIN")
+    try:
+        src.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=max(pages, 1), progress=progress)
+    finally:
+        src.rollback()
+    return total
+
+
+def create_backup(
+    backup_dir: str | Path | None = None,
+    compress: bool | None = None,
+    keep: int | None = None,
+    db_path: str | Path | None = None,
+) -> BackupResult:
+    """Take a consistent snapshot of the live database without stopping the service."""
+    src_path = Path(db_path) if db_path else database_path()
+    out_dir = Path(backup_dir or settings.backup_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    compress = settings.backup_compress if compress is None else compress
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    final = out_dir / f"{src_path.stem}-{stamp}.sqlite{'.gz' if compress else ''}"
+    partial = out_dir / f".{final.name}.partial"
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        raw = Path(tmp) / "snapshot.sqlite"
+        src = sqlite3.connect(src_path)
+        dst = sqlite3.connect(raw)
+        try:
+            pages = _copy_online(src, dst, settings.backup_pages_per_step, settings.backup_step_sleep_ms)
+        finally:
+            dst.close()
+            src.close()
+        if compress:
+            with raw.open("rb") as fin, gzip.open(partial, "wb", compresslevel=6) as fout:
+                shutil.copyfileobj(fin, fout, length=1 << 20)
+        else:
+            shutil.move(raw, partial)
+    partial.replace(final)  # atomic: a half-written snapshot never carries a real name
+    elapsed = time.perf_counter() - started
+
+    removed = rotate(out_dir, keep)
+    return BackupResult(path=final, size=final.stat().st_size, pages=pages, seconds=elapsed, removed=removed)
+
+
+def restore_backup(snapshot: str | Path, db_path: str | Path | None = None, safety_backup: bool = True) -> Path:
+    """
+    Replace the contents of the live database with `snapshot`.
+    Writes through the backup API (not a file copy) so WAL/journal state stays consistent.
+    Takes a safety snapshot of the current database first unless disabled.
+    Bumps `PRAGMA user_version` (the restore generation), so running workers notice the swap
+    and reload their caches (app/coordination.py).
+    """
+    snap = Path(snapshot)
+    if not snap.is_file():
+        raise FileNotFoundError(snap)
+    target = Path(db_path) if db_path else database_path()
+    if safety_backup and target.exists():
+        create_backup(compress=True, keep=0, db_path=target)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_file = snap
+        if snap.name.endswith(".gz"):
+            src_file = Path(tmp) / "restore.sqlite"
+            with gzip.open(snap, "rb") as fin, src_file.open("wb") as fout:
+                shutil.copyfileobj(fin, fout, length=1 << 20)
+        src = sqlite3.connect(src_file)
+        try:
+            ok = src.execute("PRAGMA integrity_check").fetchone()
+            if not ok or ok[0] != "ok":
+                raise ValueError(f"Snapshot failed integrity check: {snap}")
+            dst = sqlite3.connect(target)
+            try:
+                generation = dst.execute("PRAGMA user_version").fetchone()[0]
+                _copy_online(src, dst, settings.backup_pages_per_step, settings.backup_step_sleep_ms)
+                dst.execute(f"PRAGMA user_version = {int(generation) + 1}")
+                dst.commit()
+            finally:
+                dst.close()
+        finally:
+            src.close()
+    return target
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.backup", description="Online SQLite backup / restore")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    c = sub.add_parser("create", help="take an online snapshot")
+    c.add_argument("--dir", default=None)
+    c.add_argument("--no-compress", action="store_true")
+    c.add_argument("--keep", type=int, default=None)
+
+    ls = sub.add_parser("list", help="list snapshots, newest first")
+    ls.add_argument("--dir", default=None)
+
+    r = sub.add_parser(
+        "restore",
+        help="restore a snapshot into the configured database (running workers reload their caches)",
+    )
+    r.add_argument("snapshot")
+    r.add_argument("--no-safety-backup", action="store_true")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "create":
+        res = create_backup(args.dir, compress=not args.no_compress, keep=args.keep)
+        print(f"{res.path}  {res.size} bytes  {res.pages} pages  {res.seconds:.2f}s")
+        for p in res.removed:
+            print(f"rotated out {p}")
+    elif args.cmd == "list":
+        for p in list_backups(args.dir):
+            print(f"{p}  {p.stat().st_size} bytes")
+    elif args.cmd == "restore":
+        target = restore_backup(args.snapshot, safety_backup=not args.no_safety_backup)
+        print(f"restored {args.snapshot} -> {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
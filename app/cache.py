@@ -0,0 +1,175 @@
+"""
+Read-through cache of serialized tasks for GET /tasks/{id}.
+
+Values are the task's JSON bytes (exactly what the endpoint returns), so a hit skips the
+database and serialization, and entry sizes are known for the byte budget. Every write path
+in app/crud.py and app/routers/suggestions.py calls `task_cache.invalidate(...)` after commit.
+
+The storage is pluggable via `task_cache_backend`:
+- "memory": in-process LRU bounded by entry count and bytes, with a TTL (default)
+- "none":   caching disabled
+- "package.module:Class": any CacheBackend implementation, e.g. a shared cache when several
+  workers serve the same database (constructed with no arguments)
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from .config import settings
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict: ...
+
+
+class MemoryLRUCache:
+    """LRU over (entries, bytes) with per-entry TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, value = item
+            if expires and expires < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl_s if self.ttl_s > 0 else 0.0
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (expires, value)
+            self._bytes += len(value)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class NullCache:
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+
+def load_backend(spec: str) -> CacheBackend:
+    if spec == "memory":
+        return MemoryLRUCache(settings.task_cache_max_entries, settings.task_cache_max_bytes, settings.task_cache_ttl_s)
+    if spec == "none":
+        return NullCache()
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"task_cache_backend must be 'memory', 'none' or 'module:Class', got {spec!r}")
+    return getattr(importlib.import_module(module), name)()
+
+
+class TaskCache:
+    """
+    Task-id keyed facade over a backend.
+    `token()` / `fill()` guard against a slow reader re-inserting a row that a concurrent
+    write has just invalidated: the fill is dropped if any invalidation happened in between.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._epoch = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(task_id: int) -> str:
+        return f"task:{task_id}"
+
+    def get(self, task_id: int) -> bytes | None:
+        return self.backend.get(self._key(task_id))
+
+    def token(self) -> int:
+        return self._epoch
+
+    def fill(self, task_id: int, value: bytes, token: int) -> None:
+        if token == self._epoch:
+            self.backend.set(self._key(task_id), value)
+
+    def invalidate(self, *task_ids: int) -> None:
+        self._epoch += 1
+        for tid in task_ids:
+            self.backend.delete(self._key(tid))
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "invalidations": self.invalidations}
+
+
+task_cache = TaskCache(load_backend(settings.task_cache_backend))
@@ -0,0 +1,150 @@
+"""
+Opt-in traffic capture for load testing (`CAPTURE_ENABLED=true`).
+
+Each request is written as one JSON line: wall-clock start, method, path, query, JSON body,
+status and duration. Headers are never recorded; body keys and query parameters listed in
+`capture_redact_fields` are replaced with "[REDACTED]" and bodies over
+`capture_max_body_bytes` are dropped.
+Lines go through a QueueHandler so the request path never waits on disk; the file rotates
+at `capture_max_bytes`, keeping `capture_backups` old files.
+
+Replay a capture with `python scripts/replay.py run captures/traffic.jsonl ...`. In
+multi-worker mode (`coordination_enabled`) each worker writes `traffic.<pid>.jsonl`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+REDACTED = "[REDACTED]"
+
+log = logging.getLogger("app.capture")
+log.propagate = False
+log.setLevel(logging.INFO)
+_listener: QueueListener | None = None
+
+
+def start() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    path = Path(settings.capture_path)
+    if settings.coordination_enabled:
+        # Several workers must not rotate one file; replay.py merges the per-process files
+        path = path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        path, maxBytes=settings.capture_max_bytes, backupCount=settings.capture_backups, encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    q: queue.Queue[logging.LogRecord] = queue.Queue()
+    log.addHandler(QueueHandler(q))
+    _listener = QueueListener(q, file_handler)
+    _listener.start()
+
+
+def stop() -> None:
+    """Flush pending lines and close the file."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for h in list(log.handlers):
+        log.removeHandler(h)
+    for h in _listener.handlers:
+        h.close()
+    _listener = None
+
+
+def _csv(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def sanitize(value: Any, redact: set[str]) -> Any:
+    if isinstance(value, dict):
+        return {k: REDACTED if k.lower() in redact else sanitize(v, redact) for k, v in value.items()}
+    if isinstance(value, list):
+        return [sanitize(v, redact) for v in value]
+    return value
+
+
+def _query(raw: str, redact: set[str]) -> str:
+    pairs = parse_qsl(raw, keep_blank_values=True)
+    if not any(k.lower() in redact for k, _ in pairs):
+        return raw
+    return urlencode([(k, REDACTED if k.lower() in redact else v) for k, v in pairs], safe="[]")
+
+
+def _body(raw: bytes, content_type: str, redact: set[str]) -> Any:
+    if not raw or len(raw) > settings.capture_max_body_bytes or "json" not in content_type:
+        return None
+    try:
+        return sanitize(json.loads(raw), redact)
+    except ValueError:
+        return None
+
+
+class CaptureMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.exclude = tuple(_csv(settings.capture_exclude_paths))
+        self.redact = {f.lower() for f in _csv(settings.capture_redact_fields)}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _listener is None or (self.exclude and scope["path"].startswith(self.exclude)):
+            await self.app(scope, receive, send)
+            return
+
+        chunks: list[bytes] = []
+        size = 0
+        status = 500  # stays 500 if the app raises before responding
+
+        async def receive_wrapper() -> Message:
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= settings.capture_max_body_bytes:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.time()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            content_type = ""
+            for k, v in scope.get("headers", []):
+                if k == b"content-type":
+                    content_type = v.decode("latin-1")
+                    break
+            raw = b"".join(chunks) if size <= settings.capture_max_body_bytes else b""
+            record = {
+                "t": round(started, 6),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": _query(scope.get("query_string", b"").decode("latin-1"), self.redact),
+                "body": _body(raw, content_type, self.redact),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+            }
+            log.info(json.dumps(record, separators=(",", ":"), default=str))
@@ -0,0 +1,221 @@
+"""
+Response compression and precompressed static assets.
+
+- CompressionMiddleware: content-negotiated brotli/gzip for buffered responses (the JSON API)
+  at or above `compress_min_size` bytes.
+- PrecompressedStaticFiles: serves `.br`/`.gz` siblings built by `precompress_static`, with
+  ETag/Last-Modified revalidation and Cache-Control headers.
+
+Brotli is optional; without the `brotli` package only gzip is offered.
+
+    python -m app.compression static   # build .gz/.br siblings ahead of time (e.g. in the image)
+"""
+
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import sys
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".map", ".xml"}
+
+
+def _accepted(accept_encoding: str) -> set[str]:
+    out: set[str] = set()
+    for part in accept_encoding.lower().split(","):
+        token, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if token and q > 0:
+            out.add(token)
+    return out
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        assert brotli is not None
+        return brotli.compress(body, quality=min(max(settings.compress_level, 0), 11))
+    return gzip.compress(body, compresslevel=min(max(settings.compress_level, 1), 9), mtime=0)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """Compress single-body responses; streamed and already-encoded responses pass through untouched."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None):
+        self.app = app
+        self.minimum_size = settings.compress_min_size if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            assert start is not None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            eligible = (
+                not message.get("more_body", False)
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            if eligible:
+                _add_vary(headers)
+            if eligible and len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+                message = {**message, "body": body}
+            else:
+                passthrough = True
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that prefers `<file>.br` / `<file>.gz` siblings when the client accepts them.
+    HTML is revalidated on every load (cheap 304 via ETag); other assets are served as immutable,
+    so reference them by fingerprinted names.
+    """
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        headers = {"cache-control": _cache_control(path)}
+
+        served_path, served_stat = path, stat_result
+        if Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            headers["vary"] = "Accept-Encoding"
+            accepted = _accepted(request_headers.get("accept-encoding", ""))
+            for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+                if enc not in accepted and "*" not in accepted:
+                    continue
+                try:
+                    sib = os.stat(path + ext)
+                except OSError:
+                    continue
+                if sib.st_mtime >= stat_result.st_mtime:  # skip stale siblings
+                    served_path, served_stat = path + ext, sib
+                    headers["content-encoding"] = enc
+                    break
+
+        response = FileResponse(
+            served_path, status_code=status_code, stat_result=served_stat, media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _cache_control(path: str) -> str:
+    if path.endswith(".html"):
+        return "no-cache"
+    return f"public, max-age={settings.static_max_age}, immutable"
+
+
+def _write_atomic(dest: Path, data: bytes, mtime: float) -> None:
+    # Per-process temp name: several workers may precompress the same file at once
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.utime(tmp, (mtime, mtime))
+    tmp.replace(dest)
+
+
+def precompress_static(directory: str | Path) -> list[Path]:
+    """Write `.gz` (and `.br` when available) next to compressible assets; skips up-to-date siblings."""
+    written: list[Path] = []
+    root = Path(directory)
+    if not root.is_dir():
+        return written
+    encoders: list[tuple[str, str]] = [("gzip", ".gz")]
+    if brotli is not None:
+        encoders.append(("br", ".br"))
+    for src in root.rglob("*"):
+        if not src.is_file() or src.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        st = src.stat()
+        data: bytes | None = None
+        for enc, ext in encoders:
+            dest = src.with_name(src.name + ext)
+            if dest.exists() and dest.stat().st_mtime >= st.st_mtime:
+                continue
+            if data is None:
+                data = src.read_bytes()
+            # max quality is fine here: this runs once per asset, not per request
+            body = brotli.compress(data, quality=11) if enc == "br" else gzip.compress(data, 9, mtime=0)
+            _write_atomic(dest, body, st.st_mtime)
+            written.append(dest)
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[2] if len(sys.argv) > 2 else "static"
+    if len(sys.argv) < 2 or sys.argv[1] != "static":
+        print("usage: python -m app.compression static [DIR]")
+        raise SystemExit(2)
+    for p in precompress_static(target):
+        print(p)
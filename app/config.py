@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,6 +7,78 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./taskdb.sqlite"
     app_env: str = "dev"
 
+    # SQLite durability / journaling (applied as PRAGMAs on every new connection)
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "FULL"
+    sqlite_busy_timeout_ms: int = 5000  # wait this long for another process's write lock
+
+    # Group commit for task creation: flush every `write_batch_window_ms` or `write_batch_max` items
+    write_batch_enabled: bool = True
+    write_batch_window_ms: float = 2.0
+    write_batch_max: int = 256
+
+    # Online backups (python -m app.backup / POST /admin/backup)
+    backup_dir: str = "backups"
+    backup_keep: int = 7  # newest N snapshots kept; 0 keeps everything
+    backup_compress: bool = True
+    backup_pages_per_step: int = 256
+    backup_step_sleep_ms: float = 5.0  # pause after each step (WAL mode), spreads the copy's I/O
+
+    # Response compression (API) and precompressed static assets (/ui)
+    compress_min_size: int = 1024
+    compress_level: int = 6
+    static_precompress: bool = True  # build .gz/.br siblings at startup
+    static_max_age: int = 31536000  # non-HTML assets; HTML is always revalidated
+
+    # Admission control: per-route concurrency slots + bounded wait queue; overflow is rejected fast
+    admission_enabled: bool = True
+    admission_queue_timeout_s: float = 10.0
+    admission_retry_after_s: int = 1
+    admission_reject_status: int = 503
+    ingest_max_concurrent: int = 4
+    ingest_max_queue: int = 64
+    suggestions_max_concurrent: int = 2
+    suggestions_max_queue: int = 8
+
+    # Traffic capture for replay/load testing (off by default); comma-separated lists
+    capture_enabled: bool = False
+    capture_path: str = "captures/traffic.jsonl"
+    capture_max_bytes: int = 50 * 1024 * 1024
+    capture_backups: int = 5
+    capture_max_body_bytes: int = 64 * 1024
+    capture_exclude_paths: str = "/health,/ui,/admin"
+    capture_redact_fields: str = "password,token,secret,authorization,api_key"
+
+    # Capture-time duplicate detection against open tasks (POST /tasks, /ingest)
+    dedup_enabled: bool = True
+    dedup_threshold: float = 0.6
+    dedup_max_results: int = 3
+    dedup_merge_threshold: float = 0.9  # ?merge=true folds the capture into an existing task at/above this
+    dedup_max_candidates: int = 256  # postings read per lookup; bounds worst-case latency
+
+    # Read-through cache for GET /tasks/{id}: "memory", "none" or "package.module:Class"
+    task_cache_backend: str = "memory"
+    task_cache_max_entries: int = 10_000
+    task_cache_max_bytes: int = 32 * 1024 * 1024
+    task_cache_ttl_s: float = 300.0
+
+    # Rejected suggestions are not re-offered; editing a title lets its rejections lapse
+    rejection_expire_on_title_change: bool = True
+
+    # Multi-worker mode (uvicorn --workers N, or several containers on one data volume).
+    # Run `python -m app.prestart` once (schema + static precompression) and set
+    # schema_init_on_startup=false so workers skip that startup work; with coordination
+    # enabled, each worker polls the change_log table to drop stale cache/index entries.
+    # Every worker checks for a restore (`python -m app.backup restore`) each poll interval.
+    # Admission limits stay per worker.
+    schema_init_on_startup: bool = True
+    coordination_enabled: bool = False
+    coordination_poll_ms: float = 500.0
+    coordination_retention_s: int = 3600
+
+    # /admin endpoints require a matching X-Admin-Token header; unset, they answer 403
+    admin_token: str | None = None
+
     model_config = SettingsConfigDict(env_file=".env", env_prefix="", case_sensitive=False)
 
 
@@ -0,0 +1,240 @@
+"""
+Cross-process cache coordination for multi-worker deployments (`coordination_enabled`).
+
+Every worker keeps its own task cache, duplicate index and rejection store. With coordination
+on, each flush that inserts, updates or deletes tasks also appends one `change_log` row per
+task, in the same transaction, tagged with the writing process. A poller in every worker
+reads the rows written by other processes every `coordination_poll_ms` and:
+
+- drops the task from the task cache;
+- re-reads it into the duplicate index (or removes it when deleted);
+- for suggestion feedback, replays the touched tasks' feedback into the rejection store.
+
+SQLite hands out the write lock to one process at a time (others wait up to
+`sqlite_busy_timeout_ms`), and change_log ids are assigned under that lock, so ids follow
+commit order and a single high-water mark per worker is enough. Rows older than
+`coordination_retention_s` are pruned; a worker started later loads everything from the
+tables anyway.
+
+`python -m app.backup restore` swaps the whole file, change_log ids included, and bumps
+`PRAGMA user_version`. A worker that sees a new value resets its mark and reloads all three
+stores from the restored tables. That check runs with coordination off too (then it is all
+the poller does), since a single worker's stores go stale on a restore just the same.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import Row, delete, event, func, insert, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+
+from .cache import task_cache
+from .config import settings
+from .db import SessionLocal, engine
+from .dedup import dedup_index
+from .models import ChangeLog, Task
+from .rejections import rejections
+
+log = logging.getLogger(__name__)
+
+_HOST = socket.gethostname()
+_BATCH = 1000  # change_log rows read per query
+_PRUNE_EVERY_S = 60.0
+
+
+def origin() -> str:
+    """This process, as recorded in change_log.origin."""
+    return f"{_HOST}:{os.getpid()}"[:64]
+
+
+def _added_feedback(task: Task) -> bool:
+    """Whether this flush appends a suggestion_feedback entry to the task's history."""
+    change = inspect(task).attrs.history.history
+    if not change.added:
+        return False
+    old = (change.deleted[0] if change.deleted else None) or []
+    new = change.added[0] or []
+    return any(h.get("event") == "suggestion_feedback" for h in new[len(old) :])
+
+
+def _record_changes(session: Session, _flush_context) -> None:
+    rows: list[dict] = []
+    for obj in session.new:
+        if isinstance(obj, Task):
+            rows.append({"task_id": obj.id, "kind": "task"})
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj):
+            kind = "feedback" if _added_feedback(obj) else "task"
+            rows.append({"task_id": obj.id, "kind": kind})
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            rows.append({"task_id": obj.id, "kind": "delete"})
+    if rows:
+        me = origin()
+        session.connection().execute(insert(ChangeLog), [{**r, "origin": me} for r in rows])
+
+
+def install() -> None:
+    if not event.contains(Session, "after_flush", _record_changes):
+        event.listen(Session, "after_flush", _record_changes)
+
+
+def uninstall() -> None:
+    if event.contains(Session, "after_flush", _record_changes):
+        event.remove(Session, "after_flush", _record_changes)
+
+
+async def _generation(db: AsyncSession) -> int:
+    """Restore generation of the database (see app/backup.py restore_backup)."""
+    if engine.dialect.name != "sqlite":
+        return 0
+    return int(await db.scalar(text("PRAGMA user_version")) or 0)
+
+
+class ChangePoller:
+    def __init__(self, poll_ms: float, retention_s: float, coordinate: bool = True):
+        self.interval = max(poll_ms, 1.0) / 1000.0
+        self.retention_s = retention_s
+        self.coordinate = coordinate  # False: only watch for restores
+        self.last_id = 0
+        self.generation = 0
+        self.applied = 0
+        self.resets = 0
+        self._task: asyncio.Task | None = None
+        self._pruned_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def mark(self) -> None:
+        """
+        Take the restore generation and, when coordinating, start recording this worker's writes
+        and take the current high-water mark. Call before loading the in-memory stores, so no
+        change can fall between the two.
+        """
+        if self.coordinate:
+            install()
+        async with SessionLocal() as db:
+            self.generation = await _generation(db)
+            if self.coordinate:
+                self.last_id = await db.scalar(select(func.max(ChangeLog.id))) or 0
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="change-log-poller")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        uninstall()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+                if self.coordinate and time.monotonic() - self._pruned_at >= _PRUNE_EVERY_S:
+                    await self.prune()
+            except Exception:
+                log.exception("change_log poll failed")
+
+    async def poll(self) -> int:
+        """Apply changes committed by other processes since the last poll; returns how many."""
+        me = origin()
+        total = 0
+        async with SessionLocal() as db:
+            generation = await _generation(db)
+            if generation != self.generation:
+                await self._reset(db, generation)
+                return 0
+            while self.coordinate:
+                res = await db.execute(
+                    select(ChangeLog.id, ChangeLog.task_id, ChangeLog.kind, ChangeLog.origin)
+                    .where(ChangeLog.id > self.last_id)
+                    .order_by(ChangeLog.id)
+                    .limit(_BATCH)
+                )
+                rows = res.all()
+                if not rows:
+                    break
+                self.last_id = rows[-1].id
+                remote = [r for r in rows if r.origin != me]
+                if remote:
+                    await self._apply(db, remote)
+                    total += len(remote)
+                if len(rows) < _BATCH:
+                    break
+        self.applied += total
+        return total
+
+    async def _reset(self, db: AsyncSession, generation: int) -> None:
+        """The database was restored underneath us: start over from the restored tables."""
+        log.warning("Database restore detected (generation %d -> %d); reloading", self.generation, generation)
+        self.generation = generation
+        if self.coordinate:
+            self.last_id = await db.scalar(select(func.max(ChangeLog.id))) or 0
+        self.resets += 1
+        task_cache.clear()
+        await rejections.load(db)
+        if settings.dedup_enabled:
+            await dedup_index.load(db)
+
+    async def _apply(self, db: AsyncSession, rows: Sequence[Row]) -> None:
+        ids = {r.task_id for r in rows}
+        task_cache.invalidate(*ids)
+        if settings.dedup_enabled:
+            res = await db.execute(
+                select(Task).options(load_only(Task.id, Task.title, Task.status)).where(Task.id.in_(ids))
+            )
+            found = {t.id: t for t in res.scalars()}
+            for tid in ids:
+                task = found.get(tid)
+                if task is None:
+                    dedup_index.remove(tid)
+                else:
+                    dedup_index.sync(task)
+        for r in rows:
+            if r.kind == "delete":
+                rejections.forget_task(r.task_id)
+        feedback = {r.task_id for r in rows if r.kind == "feedback"}
+        if feedback:
+            await rejections.refresh(db, feedback)
+
+    async def prune(self) -> int:
+        self._pruned_at = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_s)
+        async with SessionLocal() as db:
+            res = await db.execute(delete(ChangeLog).where(ChangeLog.created_at < cutoff))
+            await db.commit()
+        return res.rowcount or 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.coordinate and self.running,
+            "watching_restores": self.running,
+            "origin": origin(),
+            "last_id": self.last_id,
+            "generation": self.generation,
+            "resets": self.resets,
+            "applied": self.applied,
+            "poll_ms": self.interval * 1000,
+        }
+
+
+change_poller = ChangePoller(
+    settings.coordination_poll_ms, settings.coordination_retention_s, coordinate=settings.coordination_enabled
+)
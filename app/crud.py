@@ -1,10 +1,22 @@
-from datetime import UTC
+from collections.abc import Sequence
+from datetime import UTC, datetime
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only
 
+from .cache import task_cache
+from .dedup import dedup_index
 from .models import Task, TaskStatus
-from .schemas import TaskCreate, TaskUpdate
+from .rejections import rejections
+from .schemas import TaskCreate, TaskOut, TaskUpdate
+from .utils.merge import better_priority, uniq_union
+
+# Fields a client may request via ?fields= (everything TaskOut exposes)
+TASK_FIELDS: tuple[str, ...] = tuple(TaskOut.model_fields)
+# Large / growing columns skipped by list queries unless explicitly requested
+HEAVY_FIELDS: tuple[str, ...] = ("notes", "history", "ai_suggestions")
+LIST_DEFAULT_FIELDS: tuple[str, ...] = tuple(f for f in TASK_FIELDS if f not in HEAVY_FIELDS)
 
 
 def _normalize_due(dt):
@@ -16,23 +28,75 @@ def _normalize_due(dt):
     return dt
 
 
-async def create_task(db: AsyncSession, payload: TaskCreate) -> Task:
+def _new_task(payload: TaskCreate) -> Task:
     data = payload.model_dump()
     data["due"] = _normalize_due(data.get("due"))
-    task = Task(**data)
+    return Task(**data)
+
+
+async def create_task(db: AsyncSession, payload: TaskCreate) -> Task:
+    task = _new_task(payload)
     db.add(task)
     await db.commit()
     await db.refresh(task)
+    dedup_index.sync(task)
     return task
 
 
-async def get_task(db: AsyncSession, task_id: int) -> Task | None:
-    res = await db.execute(select(Task).where(Task.id == task_id))
+async def create_tasks(db: AsyncSession, payloads: list[TaskCreate]) -> list[Task]:
+    """Insert several tasks in one transaction (one commit / fsync for the whole batch)."""
+    tasks = [_new_task(p) for p in payloads]
+    db.add_all(tasks)
+    await db.commit()
+    # expire_on_commit=False keeps the flushed values (ids, defaults) loaded; no per-row refresh needed
+    for t in tasks:
+        dedup_index.sync(t)
+    return tasks
+
+
+def _projection(fields: Sequence[str] | None, defer_heavy: bool = False) -> list:
+    """Loader options narrowing the SELECT to `fields` (the primary key is always loaded)."""
+    if fields:
+        return [load_only(*(getattr(Task, f) for f in fields))]
+    if defer_heavy:
+        return [defer(getattr(Task, f)) for f in HEAVY_FIELDS]
+    return []
+
+
+def task_fields(task: Task, fields: Sequence[str] | None = None) -> dict:
+    """Plain dict of the selected fields; only touches attributes the projection loaded."""
+    return {f: getattr(task, f) for f in (fields or TASK_FIELDS)}
+
+
+async def get_task(db: AsyncSession, task_id: int, fields: Sequence[str] | None = None) -> Task | None:
+    stmt = select(Task).where(Task.id == task_id).options(*_projection(fields))
+    res = await db.execute(stmt)
     return res.scalar_one_or_none()
 
 
-async def list_tasks(db: AsyncSession, status: str | None = None, limit: int = 100, offset: int = 0) -> list[Task]:
-    stmt = select(Task).order_by(Task.created_at.desc())
+async def get_task_json(db: AsyncSession, task_id: int) -> bytes | None:
+    """The task as TaskOut JSON, served from the read-through cache when possible."""
+    cached = task_cache.get(task_id)
+    if cached is not None:
+        return cached
+    token = task_cache.token()
+    task = await get_task(db, task_id)
+    if task is None:
+        return None
+    body = TaskOut.model_validate(task).model_dump_json().encode()
+    task_cache.fill(task_id, body, token)
+    return body
+
+
+async def list_tasks(
+    db: AsyncSession,
+    status: str | None = None,
+    limit: int = 100,
+    offset: int = 0,
+    fields: Sequence[str] | None = None,
+) -> list[Task]:
+    """List tasks newest first. Heavy columns are deferred unless named in `fields`."""
+    stmt = select(Task).options(*_projection(fields, defer_heavy=True)).order_by(Task.created_at.desc())
     if status:
         stmt = stmt.where(Task.status == TaskStatus(status))
     stmt = stmt.limit(limit).offset(offset)
@@ -50,6 +114,35 @@ async def update_task(db: AsyncSession, task_id: int, payload: TaskUpdate):
     for k, v in updates.items():
         setattr(task, k, v)
     await db.commit()
+    task_cache.invalidate(task_id)
+    await db.refresh(task)
+    dedup_index.sync(task)
+    return task
+
+
+async def merge_duplicate(db: AsyncSession, task_id: int, payload: TaskCreate) -> Task | None:
+    """Fold a new capture into an existing task instead of creating a duplicate."""
+    task = await get_task(db, task_id)
+    if not task:
+        return None
+    task.context = uniq_union(task.context, payload.context) or task.context
+    task.people = uniq_union(task.people, payload.people) or task.people
+    task.links = uniq_union(task.links, payload.links) or task.links
+    task.priority = better_priority(task.priority, payload.priority) or task.priority
+    if not task.project and payload.project:
+        task.project = payload.project
+    due = _normalize_due(payload.due)
+    if due and (not task.due or due < task.due):
+        task.due = due
+    entry = {
+        "event": "duplicate_merged",
+        "title": payload.title,
+        "channel": payload.channel,
+        "timestamp": datetime.now(UTC).isoformat(),
+    }
+    task.history = [*(task.history or []), entry]
+    await db.commit()
+    task_cache.invalidate(task_id)
     await db.refresh(task)
     return task
 
@@ -60,4 +153,7 @@ async def delete_task(db: AsyncSession, task_id: int) -> bool:
         return False
     await db.delete(task)
     await db.commit()
+    task_cache.invalidate(task_id)
+    dedup_index.remove(task_id)
+    rejections.forget_task(task_id)
     return True
@@ -0,0 +1,156 @@
+"""
+Live in-memory similarity index of open tasks, used to flag duplicates at capture time.
+
+Scores are the same token cosine the suggestions use (`tokenize` + `cosine_similarity`),
+but candidates come from an inverted index instead of a scan:
+
+- prefix filtering: a title with n distinct tokens can only reach cosine >= t against titles
+  sharing at least ceil(t^2 * n) of them, so only the rarest n - ceil(t^2 * n) + 1 query tokens
+  need their postings read (common words like "send" usually drop out; exact for titles
+  without repeated words, which is nearly all of them);
+- a length filter skips titles too short/long to reach t;
+- at most `dedup_max_candidates` postings are read per lookup, newest first.
+
+The index is kept current by every write path in app/crud.py and the suggestion apply path.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .models import Task, TaskStatus
+from .utils.text import tokenize
+
+
+@dataclass(frozen=True)
+class Match:
+    id: int
+    title: str
+    score: float
+
+
+class _Entry:
+    __slots__ = ("title", "tokens", "counts", "norm")
+
+    def __init__(self, title: str, counts: Counter[str]):
+        self.title = title
+        self.tokens = frozenset(counts)
+        # Full counts only matter for titles that repeat a word; otherwise the dot product is
+        # just the size of the token-set intersection (a C-level set operation)
+        self.counts = counts if len(counts) != counts.total() else None
+        self.norm = math.sqrt(sum(v * v for v in counts.values()))
+
+
+class DuplicateIndex:
+    def __init__(self, max_candidates: int = 256):
+        self.max_candidates = max_candidates
+        self._docs: dict[int, _Entry] = {}
+        # token -> ids in insertion order (dict as an ordered set), so reversed() is newest first
+        self._postings: dict[str, dict[int, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._postings.clear()
+
+    def add(self, task_id: int, title: str) -> None:
+        self.remove(task_id)
+        counts = Counter(tokenize(title or ""))
+        if not counts:
+            return
+        self._docs[task_id] = _Entry(title, counts)
+        for tok in counts:
+            self._postings.setdefault(tok, {})[task_id] = None
+
+    def remove(self, task_id: int) -> None:
+        entry = self._docs.pop(task_id, None)
+        if entry is None:
+            return
+        for tok in entry.tokens:
+            ids = self._postings.get(tok)
+            if ids is not None:
+                ids.pop(task_id, None)
+                if not ids:
+                    del self._postings[tok]
+
+    def sync(self, task: Task) -> None:
+        """Reflect a task's current state: open tasks are indexed, done tasks are not."""
+        if task.status == TaskStatus.done:
+            self.remove(task.id)
+        else:
+            self.add(task.id, task.title)
+
+    def query(self, title: str, threshold: float, limit: int, exclude: int | None = None) -> list[Match]:
+        q = Counter(tokenize(title or ""))
+        if not q or threshold <= 0:
+            return []
+        postings = self._postings
+        present = sorted((len(postings[t]), t) for t in q if t in postings)
+        if not present:
+            return []
+
+        qset = frozenset(q)
+        q_repeats = len(q) != q.total()
+        qnorm = math.sqrt(sum(v * v for v in q.values()))
+        n = len(q)
+        t2 = threshold * threshold
+        prefix = max(n - math.ceil(t2 * n) + 1, 1)
+        min_size, max_size = t2 * n, n / t2
+
+        # Candidate ids straight from the postings (newest first), capped at max_candidates
+        budget = self.max_candidates
+        chunks: list[Iterator[int]] = []
+        for _, tok in present[:prefix]:
+            ids = postings[tok]
+            chunks.append(itertools.islice(reversed(ids), budget))
+            budget -= min(len(ids), budget)
+            if budget <= 0:
+                break
+        candidates = set(itertools.chain.from_iterable(chunks))
+        if exclude is not None:
+            candidates.discard(exclude)
+
+        docs = self._docs
+        matches: list[Match] = []
+        for tid in candidates:
+            e = docs[tid]
+            size = len(e.tokens)
+            if size < min_size or size > max_size:
+                continue
+            shared = qset & e.tokens
+            if q_repeats or e.counts is not None:
+                dc = e.counts
+                dot = float(sum(q[t] * (dc[t] if dc is not None else 1) for t in shared))
+            else:
+                dot = len(shared)
+            score = dot / (qnorm * e.norm)
+            if score >= threshold:
+                matches.append(Match(tid, e.title, min(1.0, round(score, 6))))
+        matches.sort(key=lambda m: (-m.score, -m.id))
+        return matches[:limit]
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build from the database: every task that is not done."""
+        self.clear()
+        res = await db.execute(select(Task.id, Task.title).where(Task.status != TaskStatus.done))
+        for tid, title in res.all():
+            self.add(tid, title)
+
+
+dedup_index = DuplicateIndex(settings.dedup_max_candidates)
+
+
+def find_duplicates(title: str) -> list[Match]:
+    if not settings.dedup_enabled:
+        return []
+    return dedup_index.query(title, settings.dedup_threshold, settings.dedup_max_results)
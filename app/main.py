@@ -1,22 +1,57 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from .db import Base, engine
-from .routers import health, ingest, suggestions, tasks
+from . import capture
+from .admission import AdmissionMiddleware
+from .capture import CaptureMiddleware
+from .compression import CompressionMiddleware, PrecompressedStaticFiles, precompress_static
+from .config import settings
+from .coordination import change_poller
+from .db import SessionLocal
+from .dedup import dedup_index
+from .prestart import init_schema
+from .rejections import rejections
+from .routers import admin, health, ingest, suggestions, tasks
+from .writer import write_queue
+
+STATIC_DIR = "static"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
+    if settings.schema_init_on_startup:
+        await init_schema()
+    # Always marked and started: without coordination it only watches for a restore
+    await change_poller.mark()
+    async with SessionLocal() as db:
+        await rejections.load(db)
+        if settings.dedup_enabled:
+            await dedup_index.load(db)
+    change_poller.start()
+    # With SCHEMA_INIT_ON_STARTUP=false, `python -m app.prestart` has done the startup work once
+    if settings.static_precompress and settings.schema_init_on_startup:
+        await asyncio.to_thread(precompress_static, STATIC_DIR)
+    if settings.write_batch_enabled:
+        await write_queue.start()
+    if settings.capture_enabled:
+        capture.start()
+    try:
+        yield
+    finally:
+        await write_queue.stop()
+        await change_poller.stop()
+        capture.stop()
 
 
 app = FastAPI(title="Virtual Assistant - Task Service", version="0.1.0", lifespan=lifespan)
 
+# Last added runs outermost: CORS wraps everything so 503s from admission control still carry CORS headers
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(CaptureMiddleware)  # outside admission so rejected requests are recorded too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,9 +78,10 @@ app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 app.include_router(ingest.router, prefix="/ingest", tags=["ingest"])
 app.include_router(suggestions.router, prefix="/suggestions", tags=["suggestions"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 # Serve the UI at /ui
-app.mount("/ui", StaticFiles(directory="static", html=True), name="ui")
+app.mount("/ui", PrecompressedStaticFiles(directory=STATIC_DIR, html=True), name="ui")
 
 
 @app.get("/")
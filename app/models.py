@@ -45,3 +45,17 @@ class Task(Base):
     parent_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("tasks.id"), nullable=True)
     ai_suggestions: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     history: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+
+
+class ChangeLog(Base):
+    """One row per task written, read by other workers when `coordination_enabled` (app/coordination.py)."""
+
+    __tablename__ = "change_log"
+    # AUTOINCREMENT: ids must never be reused after pruning, workers track a high-water mark
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)  # task | feedback | delete
+    origin: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
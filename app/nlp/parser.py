@@ -15,19 +15,23 @@ PEOPLE_PAT = re.compile(r"\+([\w\-]+)")
 PHOENIX_TZ = ZoneInfo("America/Phoenix")
 DATE_SETTINGS = {
     "PREFER_DATES_FROM": "future",
-    "RELATIVE_BASE": datetime.now(PHOENIX_TZ),
     "RETURN_AS_TIMEZONE_AWARE": True,
     "TIMEZONE": "America/Phoenix",
     "DATE_ORDER": "MDY",
 }
 
 
+def _date_settings() -> dict:
+    # "tomorrow" is relative to now, not to when this worker process was started
+    return {**DATE_SETTINGS, "RELATIVE_BASE": datetime.now(PHOENIX_TZ)}
+
+
 def _extract_due(text: str):
     """
     Find a date/time phrase anywhere in the text.
     Returns (due_datetime, cleaned_text).
     """
-    matches = search_dates(text, settings=DATE_SETTINGS, languages=["en"])
+    matches = search_dates(text, settings=_date_settings(), languages=["en"])
     if not matches:
         return None, text
 
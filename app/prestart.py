@@ -0,0 +1,40 @@
+"""
+One-time startup work, run before the workers: `python -m app.prestart`.
+
+Creates the schema and precompresses the static UI. With several workers (or containers)
+each doing this in their lifespan they race on it; run this once instead and start the
+workers with SCHEMA_INIT_ON_STARTUP=false, which skips both steps in the workers.
+It is idempotent and safe to run from several containers at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from . import models  # noqa: F401  (registers the tables on Base.metadata)
+from .compression import precompress_static
+from .config import settings
+from .db import Base, engine
+
+STATIC_DIR = "static"
+
+
+async def init_schema() -> None:
+    async with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Take the write lock up front so concurrent initialisers run one after another
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.commit()
+
+
+async def _main() -> None:
+    await init_schema()
+    await engine.dispose()
+    if settings.static_precompress:
+        precompress_static(STATIC_DIR)
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
+    print("schema ready")
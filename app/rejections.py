@@ -0,0 +1,161 @@
+"""
+Index of rejected suggestions, so /suggestions stops re-scoring and re-offering them.
+
+Built once at startup from `suggestion_feedback` entries with `accepted: false` in task
+history, then kept current by POST /suggestions/feedback (and, with several workers, by
+`refresh()` from app/coordination.py). Combine rejections are keyed by
+the unordered task pair, split rejections by task id; both remember a fingerprint of the
+titles at rejection time. With `rejection_expire_on_title_change`, editing a title makes
+its rejections lapse, since the old verdict was about different wording.
+
+The builders run in worker threads, so they get an immutable `snapshot()`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .models import Task
+from .utils.ids import title_fingerprint
+
+Pair = frozenset[int]
+
+
+@dataclass(frozen=True)
+class RejectionSnapshot:
+    ids: frozenset[str] = frozenset()
+    # pair -> {task_id: title fingerprint when rejected}
+    pairs: dict[Pair, dict[int, str]] = field(default_factory=dict)
+    splits: dict[int, str] = field(default_factory=dict)
+    expire_on_title_change: bool = True
+    version: int = 0
+
+    def pair_rejected(self, a_id: int, a_title: str, b_id: int, b_title: str) -> bool:
+        fps = self.pairs.get(frozenset((a_id, b_id)))
+        if fps is None:
+            return False
+        if not self.expire_on_title_change:
+            return True
+        return fps.get(a_id) == title_fingerprint(a_title) and fps.get(b_id) == title_fingerprint(b_title)
+
+    def split_rejected(self, task_id: int, title: str) -> bool:
+        fp = self.splits.get(task_id)
+        if fp is None:
+            return False
+        return not self.expire_on_title_change or fp == title_fingerprint(title)
+
+
+class RejectionStore:
+    def __init__(self) -> None:
+        self._ids: set[str] = set()
+        self._pairs: dict[Pair, dict[int, str]] = {}
+        self._splits: dict[int, str] = {}
+        self.version = 0
+        self._snapshot: RejectionSnapshot | None = None
+
+    def __len__(self) -> int:
+        return len(self._pairs) + len(self._splits)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._pairs.clear()
+        self._splits.clear()
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._snapshot = None
+
+    def record(self, kind: str, accepted: bool, suggestion_id: str | None, title_fps: dict[int, str]) -> None:
+        """
+        Apply one piece of feedback. `title_fps` maps each referenced task id to the fingerprint
+        of its title when the feedback was given (two ids for combine, one for split).
+        An acceptance clears an earlier rejection of the same candidate.
+        """
+        if kind == "combine" and len(title_fps) == 2:
+            pair = frozenset(title_fps)
+            if accepted:
+                self._pairs.pop(pair, None)
+            else:
+                self._pairs[pair] = dict(title_fps)
+        elif kind == "split" and len(title_fps) == 1:
+            ((tid, fp),) = title_fps.items()
+            if accepted:
+                self._splits.pop(tid, None)
+            else:
+                self._splits[tid] = fp
+        # Feedback without usable task ids still suppresses the exact suggestion id
+        if suggestion_id:
+            if accepted:
+                self._ids.discard(suggestion_id)
+            else:
+                self._ids.add(suggestion_id)
+        self._changed()
+
+    def forget_task(self, task_id: int) -> None:
+        changed = self._splits.pop(task_id, None) is not None
+        for pair in [p for p in self._pairs if task_id in p]:
+            del self._pairs[pair]
+            changed = True
+        if changed:
+            self._changed()
+
+    def snapshot(self) -> RejectionSnapshot:
+        if self._snapshot is None:
+            self._snapshot = RejectionSnapshot(
+                ids=frozenset(self._ids),
+                pairs={p: dict(fps) for p, fps in self._pairs.items()},
+                splits=dict(self._splits),
+                expire_on_title_change=settings.rejection_expire_on_title_change,
+                version=self.version,
+            )
+        return self._snapshot
+
+    async def refresh(self, db: AsyncSession, task_ids: set[int]) -> None:
+        """
+        Replay the feedback recorded on `task_ids` (another worker received it). Every entry
+        names all of its tasks and their fingerprints, so only these tasks' history is read.
+        """
+        res = await db.execute(select(Task.id, Task.history).where(Task.id.in_(task_ids)))
+        entries: dict[tuple[str, str], dict] = {}
+        for _tid, history in res.all():
+            for h in history or []:
+                if h.get("event") == "suggestion_feedback" and h.get("title_fps"):
+                    entries[(h.get("id") or "", h.get("timestamp") or "")] = h
+        referenced = {int(t) for h in entries.values() for t in h["title_fps"]}
+        live = set((await db.scalars(select(Task.id).where(Task.id.in_(referenced)))).all())
+        for (_, _ts), h in sorted(entries.items(), key=lambda kv: kv[0][1]):
+            # deleted tasks drop out, as in load()
+            fps = {int(t): fp for t, fp in h["title_fps"].items() if int(t) in live}
+            self.record(h.get("type") or "", bool(h.get("accepted")), h.get("id"), fps)
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Rebuild from task history. Feedback is copied into each referenced task's history, so
+        entries are grouped by (suggestion id, timestamp) to recover the task ids. Entries written
+        before title fingerprints were recorded fall back to the current titles.
+        """
+        res = await db.execute(select(Task.id, Task.title, Task.history).where(Task.history.is_not(None)))
+        titles: dict[int, str] = {}
+        groups: dict[tuple[str, str], tuple[dict, list[int]]] = {}
+        for tid, title, history in res.all():
+            titles[tid] = title
+            for h in history or []:
+                if h.get("event") == "suggestion_feedback":
+                    groups.setdefault((h.get("id") or "", h.get("timestamp") or ""), (h, []))[1].append(tid)
+
+        self._ids.clear()
+        self._pairs.clear()
+        self._splits.clear()
+        for (_, _ts), (entry, tids) in sorted(groups.items(), key=lambda kv: kv[0][1]):
+            stored = entry.get("title_fps") or {}
+            fps = {t: stored.get(str(t)) or title_fingerprint(titles.get(t, "")) for t in tids}
+            self.record(entry.get("type") or "", bool(entry.get("accepted")), entry.get("id"), fps)
+        self._changed()
+
+
+rejections = RejectionStore()
@@ -0,0 +1,45 @@
+import asyncio
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from .. import backup
+from ..config import settings
+
+_backup_lock = asyncio.Lock()
+
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    # No token configured means the admin endpoints are off, not open
+    if not settings.admin_token:
+        raise HTTPException(403, "Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(403, "Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/backup")
+async def create_backup(compress: bool | None = None):
+    """Take an online snapshot in a worker thread; live requests keep flowing between page steps."""
+    if _backup_lock.locked():
+        raise HTTPException(409, "A backup is already running")
+    async with _backup_lock:
+        try:
+            res = await asyncio.to_thread(backup.create_backup, compress=compress)
+        except ValueError as exc:
+            raise HTTPException(400, str(exc)) from exc
+    return {
+        "ok": True,
+        "path": str(res.path),
+        "size": res.size,
+        "pages": res.pages,
+        "seconds": round(res.seconds, 3),
+        "rotated": [str(p) for p in res.removed],
+    }
+
+
+@router.get("/backups")
+async def list_backups():
+    return [{"path": str(p), "size": p.stat().st_size} for p in backup.list_backups()]
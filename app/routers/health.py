@@ -1,8 +1,30 @@
 from fastapi import APIRouter
 
+from ..admission import limiter_stats
+from ..cache import task_cache
+from ..coordination import change_poller
+
 router = APIRouter()
 
 
 @router.get("")
 async def health():
     return {"ok": True}
+
+
+@router.get("/admission")
+async def admission():
+    """Per-route concurrency, queue depth and rejection counters."""
+    return limiter_stats()
+
+
+@router.get("/cache")
+async def cache():
+    """Task cache hit/miss/eviction counters."""
+    return task_cache.stats()
+
+
+@router.get("/coordination")
+async def coordination():
+    """This worker's change_log position (multi-worker mode)."""
+    return change_poller.stats()
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..crud import create_task
 from ..db import get_session
 from ..nlp.parser import parse_quick_task
-from ..schemas import TaskCreate, TaskOut
+from ..schemas import TaskCreate, TaskCreatedOut
+from .tasks import MERGE_QUERY, capture_task
 
 router = APIRouter()
 
@@ -16,9 +17,10 @@ class IngestIn(BaseModel):
     links: list[str] | None = None
 
 
-@router.post("", response_model=TaskOut)
-async def ingest(payload: IngestIn, db: AsyncSession = Depends(get_session)):
-    parsed = parse_quick_task(payload.text)
+@router.post("", response_model=TaskCreatedOut)
+async def ingest(payload: IngestIn, merge: bool = MERGE_QUERY, db: AsyncSession = Depends(get_session)):
+    # dateparser is CPU-bound; keep it off the event loop so cheap reads are not stalled behind it
+    parsed = await run_in_threadpool(parse_quick_task, payload.text)
     task = TaskCreate(
         title=parsed["title"],
         notes=parsed.get("notes"),
@@ -31,4 +33,4 @@ async def ingest(payload: IngestIn, db: AsyncSession = Depends(get_session)):
         channel=payload.channel or "api",
         # status default applies (inbox)
     )
-    return await create_task(db, task)
+    return await capture_task(db, task, merge)
@@ -1,22 +1,33 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
-from typing import Literal
+from typing import Literal, NamedTuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud
+from ..cache import task_cache
 from ..db import get_session
-from ..models import Task, TaskStatus
+from ..dedup import dedup_index
+from ..models import TaskStatus
+from ..rejections import RejectionSnapshot, rejections
 from ..schemas import TaskCreate
-from ..utils.ids import suggestion_id
+from ..utils.ids import suggestion_id, title_fingerprint
+from ..utils.merge import better_priority, uniq_union
 from ..utils.similarity import cosine_similarity
 from ..utils.text import split_phrases, tokenize
 
 router = APIRouter()
+log = logging.getLogger(__name__)
 
 
 class ApplyIn(BaseModel):
@@ -49,25 +60,199 @@ class SplitSuggestion(BaseModel):
 
 Suggestion = CombineSuggestion | SplitSuggestion  # py311 union
 
+_DEADLINE_CHECK_EVERY = 64  # pairs scored between clock reads
+_REFINED_MAX = 32
+_REFINE_MAX_PAIRS = 100_000  # background refinement stops here (~1s of CPU held away from requests)
+
+# Combine results and whether they are complete, keyed by (threshold, top_k, corpus fingerprint,
+# rejections version). A deadline-cut answer schedules a fuller computation on one background
+# thread; the next call over the same corpus is served the refined result. Refinement is capped
+# at _REFINE_MAX_PAIRS and is not resumed: past the cap (roughly limit > 450) the cached answer
+# stays partial and is reported as such, until a call without budget_ms computes it in full.
+# At most one refinement waits behind the running one: a newer request replaces the waiting
+# job, since its corpus is the current one.
+_refined: OrderedDict[tuple, tuple[list[CombineSuggestion], bool]] = OrderedDict()
+_refine_lock = threading.Lock()
+_refine_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="suggestions-refine")
+_refine_running: tuple | None = None  # key being computed
+_refine_waiting: tuple | None = None  # (key, docs, threshold, top_k, rejected)
+_refine_active = False  # a worker loop is scheduled on the pool
+
+
+def _refined_get(key: tuple) -> tuple[list[CombineSuggestion], bool] | None:
+    with _refine_lock:
+        out = _refined.get(key)
+        if out is not None:
+            _refined.move_to_end(key)
+        return out
+
+
+def _refined_put(key: tuple, combine: list[CombineSuggestion], complete: bool) -> None:
+    with _refine_lock:
+        _refined[key] = (combine, complete)
+        _refined.move_to_end(key)
+        while len(_refined) > _REFINED_MAX:
+            _refined.popitem(last=False)
+
+
+def _refine_in_background(
+    key: tuple, docs: list[Doc], threshold: float, top_k: int, rejected: RejectionSnapshot | None = None
+) -> None:
+    global _refine_waiting, _refine_active
+    with _refine_lock:
+        if key == _refine_running or key in _refined:
+            return
+        _refine_waiting = (key, docs, threshold, top_k, rejected)
+        if _refine_active:
+            return
+        _refine_active = True
+    _refine_pool.submit(_refine_loop)
+
+
+def _refine_loop() -> None:
+    global _refine_running, _refine_waiting, _refine_active
+    while True:
+        with _refine_lock:
+            job = _refine_waiting
+            _refine_waiting = None
+            if job is None:
+                _refine_active = False
+                return
+            _refine_running = job[0]
+        key, docs, threshold, top_k, rejected = job
+        try:
+            combine, complete = _build_combine_suggestions(
+                docs, threshold, top_k, rejected=rejected, max_pairs=_REFINE_MAX_PAIRS
+            )
+            _refined_put(key, combine, complete)
+        except Exception:
+            log.exception("Background suggestion refinement failed")
+        finally:
+            with _refine_lock:
+                _refine_running = None
+
+
+class Doc(NamedTuple):
+    """The slice of a task the suggestion builders need; plain data so it can go to worker threads."""
+
+    id: int
+    title: str
+
+
+def _candidate_pairs(sets: list[frozenset[str]], skip: set[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+    """
+    Index pairs sharing at least one token, most promising first: rarest shared token first,
+    and within a token the newest tasks first (the corpus is ordered newest first).
+    Pairs sharing nothing have cosine 0 and are never produced here. A pair sharing several
+    tokens is produced only under the rarest of them, so no set of visited pairs is kept.
+    """
+    postings: dict[str, list[int]] = {}
+    for i, ts in enumerate(sets):
+        for tok in ts:
+            postings.setdefault(tok, []).append(i)
+    ordered = sorted(postings.items(), key=lambda kv: (len(kv[1]), kv[0]))
+    rank = {tok: r for r, (tok, _) in enumerate(ordered)}
+    for r, (_tok, idxs) in enumerate(ordered):
+        for a in range(len(idxs)):
+            i = idxs[a]
+            si = sets[i]
+            for b in range(a + 1, len(idxs)):
+                j = idxs[b]
+                if (i, j) in skip:
+                    continue
+                shared = si & sets[j]
+                if len(shared) > 1 and min(rank[t] for t in shared) != r:
+                    continue
+                yield i, j
+
+
+def _rejected_pairs(docs: Sequence[Doc], rejected: RejectionSnapshot) -> set[tuple[int, int]]:
+    """Index pairs (i < j) of `docs` whose combine suggestion was rejected and still stands."""
+    if not rejected.pairs:
+        return set()
+    index = {d.id: i for i, d in enumerate(docs)}
+    out: set[tuple[int, int]] = set()
+    for pair in rejected.pairs:
+        idxs = sorted(index[tid] for tid in pair if tid in index)
+        if len(idxs) != 2:
+            continue
+        i, j = idxs
+        if rejected.pair_rejected(docs[i].id, docs[i].title, docs[j].id, docs[j].title):
+            out.add((i, j))
+    return out
+
+
+def _score_combine_pairs(
+    docs: Sequence[Doc],
+    threshold: float,
+    deadline: float | None = None,
+    rejected: RejectionSnapshot | None = None,
+    max_pairs: int | None = None,
+) -> tuple[list[tuple[float, int, int]], bool]:
+    """
+    Anytime pair scoring: returns (pairs above threshold sorted best-first, complete?).
+    Stops early once `deadline` (time.monotonic()) passes or `max_pairs` pairs have been
+    visited, keeping what was scored so far. Rejected pairs are never scored.
+    """
+    toks = [tokenize(d.title or "") for d in docs]
+    sets = [frozenset(t) for t in toks]
+    skip: set[tuple[int, int]] = _rejected_pairs(docs, rejected) if rejected is not None else set()
+    pairs: list[tuple[float, int, int]] = []
+    visited = 0  # pairs looked at, across both passes
+
+    def out_of_time() -> bool:
+        if max_pairs is not None and visited >= max_pairs:
+            return True
+        return deadline is not None and visited % _DEADLINE_CHECK_EVERY == 0 and time.monotonic() >= deadline
+
+    complete = True
+    for i, j in _candidate_pairs(sets, skip):
+        if out_of_time():
+            complete = False
+            break
+        visited += 1
+        s = _clamp01(cosine_similarity(toks[i], toks[j]))
+        if s >= threshold:
+            pairs.append((s, i, j))
+    if complete and threshold <= 0.0:
+        # Only a zero threshold admits pairs with no shared token
+        for i in range(len(docs)):
+            for j in range(i + 1, len(docs)):
+                # pairs sharing a token were scored above
+                if (i, j) in skip or not sets[i].isdisjoint(sets[j]):
+                    continue
+                if out_of_time():
+                    complete = False
+                    break
+                visited += 1
+                pairs.append((0.0, i, j))
+            if not complete:
+                break
+    # (i, j) tie-break keeps the order of the exhaustive i<j scan
+    pairs.sort(key=lambda x: (-x[0], x[1], x[2]))
+    return pairs, complete
+
 
-def _build_combine_suggestions(tasks: list[Task], threshold: float, top_k: int) -> list[CombineSuggestion]:
-    toks = {t.id: tokenize(t.title or "") for t in tasks}
-    pairs: list[tuple[float, Task, Task]] = []
-    for i in range(len(tasks)):
-        for j in range(i + 1, len(tasks)):
-            t1, t2 = tasks[i], tasks[j]
-            s = _clamp01(cosine_similarity(toks[t1.id], toks[t2.id]))
-            if s >= threshold:
-                pairs.append((s, t1, t2))
-    pairs.sort(key=lambda x: x[0], reverse=True)
+def _build_combine_suggestions(
+    docs: Sequence[Doc],
+    threshold: float,
+    top_k: int,
+    deadline: float | None = None,
+    rejected: RejectionSnapshot | None = None,
+    max_pairs: int | None = None,
+) -> tuple[list[CombineSuggestion], bool]:
+    pairs, complete = _score_combine_pairs(docs, threshold, deadline, rejected, max_pairs)
 
     used: set[int] = set()
     out: list[CombineSuggestion] = []
-    for score, t1, t2 in pairs:
+    for score, i, j in pairs:
+        t1, t2 = docs[i], docs[j]
         if t1.id in used or t2.id in used:
             continue
         title = t1.title if len(t1.title) <= len(t2.title) else t2.title
         sid = suggestion_id(f"combine|{sorted([t1.id, t2.id])}|{round(score,4)}|{title}")
+        if rejected is not None and sid in rejected.ids:
+            continue
         out.append(
             CombineSuggestion(
                 id=sid,
@@ -81,16 +266,22 @@ def _build_combine_suggestions(tasks: list[Task], threshold: float, top_k: int)
         used.add(t2.id)
         if len(out) >= top_k:
             break
-    return out
+    return out, complete
 
 
-def _build_split_suggestions(tasks: list[Task], top_k: int) -> list[SplitSuggestion]:
+def _build_split_suggestions(
+    tasks: Sequence[Doc], top_k: int, rejected: RejectionSnapshot | None = None
+) -> list[SplitSuggestion]:
     out: list[SplitSuggestion] = []
     for t in tasks:
+        if rejected is not None and rejected.split_rejected(t.id, t.title):
+            continue
         subs = split_phrases(t.title or "")
         if len(subs) >= 2:
             score = min(0.4 + 0.1 * len(subs), 0.9)
             sid = suggestion_id(f"split|{t.id}|{','.join(subs)}|{round(score,4)}")
+            if rejected is not None and sid in rejected.ids:
+                continue
             out.append(
                 SplitSuggestion(
                     id=sid,
@@ -125,28 +316,6 @@ def _merge_interleaved(combine: Sequence[Suggestion], split: Sequence[Suggestion
     return merged
 
 
-def _uniq_union(a: list[str] | None, b: list[str] | None) -> list[str]:
-    if not a and not b:
-        return []
-    a = a or []
-    b = b or []
-    # preserve order, remove dups
-    return list(dict.fromkeys(a + b))
-
-
-def _better_priority(p: str | None, q: str | None) -> str | None:
-    # P0 is highest; keep the better (lower number)
-    def score(x):
-        if not x:
-            return 999
-        try:
-            return int(x[1:])
-        except Exception:
-            return 999
-
-    return p if score(p) <= score(q) else q
-
-
 async def _apply_combine(db: AsyncSession, a_id: int, b_id: int, sid: str) -> dict:
     a = await crud.get_task(db, a_id)
     b = await crud.get_task(db, b_id)
@@ -157,10 +326,10 @@ async def _apply_combine(db: AsyncSession, a_id: int, b_id: int, sid: str) -> di
     primary, secondary = (a, b) if len(a.title or "") <= len(b.title or "") else (b, a)
 
     # Merge simple fields
-    primary.context = _uniq_union(primary.context, secondary.context)
-    primary.people = _uniq_union(primary.people, secondary.people)
-    primary.links = _uniq_union(primary.links, secondary.links)
-    primary.priority = _better_priority(primary.priority, secondary.priority) or primary.priority
+    primary.context = uniq_union(primary.context, secondary.context)
+    primary.people = uniq_union(primary.people, secondary.people)
+    primary.links = uniq_union(primary.links, secondary.links)
+    primary.priority = better_priority(primary.priority, secondary.priority) or primary.priority
     if not primary.project and secondary.project:
         primary.project = secondary.project
     if secondary.due and (not primary.due or secondary.due < primary.due):
@@ -179,17 +348,19 @@ async def _apply_combine(db: AsyncSession, a_id: int, b_id: int, sid: str) -> di
         "merged": [primary.id, secondary.id],
     }
     for t in (primary, secondary):
-        hist = t.history or []
-        hist.append(entry)
-        t.history = hist
+        # A new list: appending in place is not seen as a change by SQLAlchemy
+        t.history = [*(t.history or []), entry]
 
     # Mark secondary done and point it to primary for traceability
     secondary.status = TaskStatus.done
     secondary.parent_id = primary.id
 
     await db.commit()
+    task_cache.invalidate(primary.id, secondary.id)
     await db.refresh(primary)
     await db.refresh(secondary)
+    dedup_index.sync(primary)
+    dedup_index.sync(secondary)
     return {"primary_id": primary.id, "secondary_id": secondary.id}
 
 
@@ -230,25 +401,48 @@ async def _apply_split(db: AsyncSession, task_id: int, subtasks: list[str], sid:
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "children": created_ids,
     }
-    hist = parent.history or []
-    hist.append(entry)
-    parent.history = hist
+    parent.history = [*(parent.history or []), entry]
 
     await db.commit()
+    task_cache.invalidate(parent.id)
     await db.refresh(parent)
     return {"parent_id": parent.id, "children": created_ids}
 
 
 @router.get("", response_model=list[Suggestion])
 async def get_suggestions(
+    response: Response,
     threshold: float = Query(0.45, ge=0.0, le=1.0, description="Cosine similarity threshold for combine suggestions"),
     top_k: int = Query(5, ge=1, le=20),
     include_split: bool = Query(True),
+    budget_ms: int | None = Query(
+        None, ge=1, le=60_000, description="Time budget; when it runs out the best results so far are returned"
+    ),
+    limit: int = Query(200, ge=2, le=1_000, description="Most recent tasks to consider"),
     db: AsyncSession = Depends(get_session),
 ) -> list[Suggestion]:
-    tasks = await crud.list_tasks(db, status=None, limit=200, offset=0)
-    combine = _build_combine_suggestions(tasks, threshold=threshold, top_k=top_k)
-    split = _build_split_suggestions(tasks, top_k=top_k) if include_split else []
+    deadline = time.monotonic() + budget_ms / 1000 if budget_ms else None
+    tasks = await crud.list_tasks(db, status=None, limit=limit, offset=0, fields=["id", "title"])
+    docs = [Doc(t.id, t.title or "") for t in tasks]
+
+    rejected = rejections.snapshot()
+    key = (threshold, top_k, hash(tuple(docs)), rejected.version)
+    cached = _refined_get(key)
+    if cached is not None and (cached[1] or deadline is not None):
+        combine, complete = cached
+    else:
+        # Pairwise scoring is CPU-bound: keep it off the event loop
+        combine, complete = await run_in_threadpool(
+            _build_combine_suggestions, docs, threshold, top_k, deadline, rejected
+        )
+        if complete:
+            _refined_put(key, combine, True)
+        else:
+            _refine_in_background(key, docs, threshold, top_k, rejected)
+    partial = not complete
+    split = _build_split_suggestions(docs, top_k=top_k, rejected=rejected) if include_split else []
+    # Partial = the deadline cut scoring short; clients may ask again for the refined answer
+    response.headers["X-Suggestions-Partial"] = "true" if partial else "false"
     # OLD:
     # merged: List[Suggestion] = sorted([*combine, *split], key=lambda s: s.score, reverse=True)
     # return merged[:top_k]
@@ -284,26 +478,25 @@ async def submit_feedback(payload: FeedbackIn, db: AsyncSession = Depends(get_se
         "timestamp": now,
     }
 
-    touched: list[int] = []
+    ids: list[int] = []
     if payload.type == "combine" and payload.task_ids:
-        for tid in payload.task_ids:
-            task = await crud.get_task(db, tid)
-            if not task:
-                continue
-            hist = task.history or []
-            hist.append(entry)
-            task.history = hist
-            touched.append(tid)
+        ids = payload.task_ids
     elif payload.type == "split" and payload.task_id is not None:
-        task = await crud.get_task(db, payload.task_id)
-        if task:
-            hist = task.history or []
-            hist.append(entry)
-            task.history = hist
-            touched.append(payload.task_id)
+        ids = [payload.task_id]
+    tasks = [t for t in [await crud.get_task(db, tid) for tid in ids] if t]
+    # Titles as they were when judged, so the rejection can lapse once a title is edited
+    title_fps = {t.id: title_fingerprint(t.title) for t in tasks}
+    entry["title_fps"] = {str(tid): fp for tid, fp in title_fps.items()}
+
+    touched: list[int] = []
+    for task in tasks:
+        task.history = [*(task.history or []), entry]
+        touched.append(task.id)
 
     if touched:
         await db.commit()
+        task_cache.invalidate(*touched)
+        rejections.record(payload.type, payload.accepted, payload.id, title_fps)
 
     return {"ok": True, "touched": touched}
 
@@ -1,34 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud
+from ..config import settings
 from ..db import get_session
-from ..schemas import TaskCreate, TaskOut, TaskUpdate
+from ..dedup import find_duplicates
+from ..schemas import DuplicateOut, TaskCreate, TaskCreatedOut, TaskFieldsOut, TaskOut, TaskUpdate
+from ..writer import write_queue
 
 router = APIRouter()
 
+MERGE_QUERY = Query(False, description="Fold into an existing open task when it is a near-certain duplicate")
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. id,title,status,due")
 
-@router.post("", response_model=TaskOut)
-async def create_task(payload: TaskCreate, db: AsyncSession = Depends(get_session)):
-    return await crud.create_task(db, payload)
 
+def _parse_fields(raw: str | None) -> list[str] | None:
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in crud.TASK_FIELDS]
+    if unknown:
+        raise HTTPException(400, f"Unknown field(s): {', '.join(unknown)}")
+    return fields
 
-@router.get("", response_model=list[TaskOut])
+
+async def capture_task(db: AsyncSession, payload: TaskCreate, merge: bool) -> TaskCreatedOut:
+    """Create a task, reporting likely duplicates; with `merge`, fold it into a near-identical one."""
+    matches = find_duplicates(payload.title)
+    duplicates = [DuplicateOut(id=m.id, title=m.title, score=m.score) for m in matches]
+    if merge and matches and matches[0].score >= settings.dedup_merge_threshold:
+        existing = await crud.merge_duplicate(db, matches[0].id, payload)
+        if existing:
+            out = TaskCreatedOut.model_validate(existing)
+            out.duplicates = duplicates
+            out.merged = True
+            return out
+    task = await write_queue.submit(payload)
+    out = TaskCreatedOut.model_validate(task)
+    out.duplicates = duplicates
+    return out
+
+
+@router.post("", response_model=TaskCreatedOut)
+async def create_task(payload: TaskCreate, merge: bool = MERGE_QUERY, db: AsyncSession = Depends(get_session)):
+    return await capture_task(db, payload, merge)
+
+
+@router.get("", response_model=list[TaskFieldsOut], response_model_exclude_unset=True)
 async def list_tasks(
     status: str | None = Query(None, description="Filter by status"),
     limit: int = 100,
     offset: int = 0,
+    fields: str | None = FIELDS_QUERY,
     db: AsyncSession = Depends(get_session),
 ):
-    return await crud.list_tasks(db, status=status, limit=limit, offset=offset)
+    # Without ?fields= the heavy columns (notes, history) are left out of list pages
+    selected = _parse_fields(fields)
+    tasks = await crud.list_tasks(db, status=status, limit=limit, offset=offset, fields=selected)
+    return [crud.task_fields(t, selected or crud.LIST_DEFAULT_FIELDS) for t in tasks]
 
 
-@router.get("/{task_id}", response_model=TaskOut)
-async def get_task(task_id: int, db: AsyncSession = Depends(get_session)):
-    task = await crud.get_task(db, task_id)
+@router.get("/{task_id}", response_model=TaskFieldsOut, response_model_exclude_unset=True)
+async def get_task(task_id: int, fields: str | None = FIELDS_QUERY, db: AsyncSession = Depends(get_session)):
+    selected = _parse_fields(fields)
+    if not selected:
+        # Full task: read-through cache of the serialized JSON
+        body = await crud.get_task_json(db, task_id)
+        if body is None:
+            raise HTTPException(404, "Task not found")
+        return Response(content=body, media_type="application/json")
+    task = await crud.get_task(db, task_id, fields=selected)
     if not task:
         raise HTTPException(404, "Task not found")
-    return task
+    return crud.task_fields(task, selected)
 
 
 @router.patch("/{task_id}", response_model=TaskOut)
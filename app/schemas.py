@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Any, cast
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, create_model
 
 from .models import TaskStatus  # <-- import the enum
 
@@ -50,3 +51,24 @@ class TaskOut(TaskBase):
     created_at: datetime
     updated_at: datetime
     history: list[dict] | None = None  # <-- add this
+
+
+class DuplicateOut(BaseModel):
+    id: int
+    title: str
+    score: float
+
+
+class TaskCreatedOut(TaskOut):
+    """Result of POST /tasks and /ingest: the task plus likely duplicates among open tasks."""
+
+    duplicates: list[DuplicateOut] = []
+    merged: bool = False  # True when the capture was folded into an existing task
+
+
+# Sparse view of a task (`?fields=`): every TaskOut field, all optional; only the selected
+# ones are set and serialized. Derived from TaskOut so the two cannot drift apart.
+_optional_fields: dict[str, Any] = {
+    name: (cast(Any, f.annotation) | None, None) for name, f in TaskOut.model_fields.items()
+}
+TaskFieldsOut = create_model("TaskFieldsOut", __config__=ConfigDict(use_enum_values=True), **_optional_fields)
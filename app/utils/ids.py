@@ -1,6 +1,13 @@
 from hashlib import sha1
 
+from .text import normalize
+
 
 def suggestion_id(seed: str) -> str:
     """Stable short id for a suggestion from a seed string."""
     return sha1(seed.encode("utf-8")).hexdigest()[:12]
+
+
+def title_fingerprint(title: str) -> str:
+    """Short fingerprint of a title, insensitive to case/punctuation/spacing edits."""
+    return suggestion_id(normalize(title or ""))
@@ -0,0 +1,20 @@
+def uniq_union(a: list[str] | None, b: list[str] | None) -> list[str]:
+    if not a and not b:
+        return []
+    a = a or []
+    b = b or []
+    # preserve order, remove dups
+    return list(dict.fromkeys(a + b))
+
+
+def better_priority(p: str | None, q: str | None) -> str | None:
+    # P0 is highest; keep the better (lower number)
+    def score(x):
+        if not x:
+            return 999
+        try:
+            return int(x[1:])
+        except Exception:
+            return 999
+
+    return p if score(p) <= score(q) else q
@@ -0,0 +1,116 @@
+"""
+Group-commit write queue for task creation.
+
+Concurrent `POST /tasks` and `/ingest` calls hand their payload to a single writer
+coroutine, which collects them for up to `write_batch_window_ms` (or until
+`write_batch_max` items are waiting) and inserts the whole batch in one transaction.
+Each caller awaits its own future and gets back its own Task with its assigned id.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from . import crud
+from .config import settings
+from .db import SessionLocal
+from .models import Task
+from .schemas import TaskCreate
+
+log = logging.getLogger(__name__)
+
+_Item = tuple[TaskCreate, "asyncio.Future[Task]"]
+
+
+class WriteQueue:
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self._queue: asyncio.Queue[_Item | None] | None = None
+        self._worker: asyncio.Task | None = None
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="task-write-queue")
+
+    async def stop(self) -> None:
+        """Flush whatever is queued, then stop the writer."""
+        if not self.running or self._queue is None or self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+        self._queue = None
+
+    async def submit(self, payload: TaskCreate) -> Task:
+        if not self.running or self._queue is None:
+            # Queue not started (batching disabled, scripts, tests without lifespan): write directly
+            async with SessionLocal() as db:
+                return await crud.create_task(db, payload)
+        fut: asyncio.Future[Task] = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_Item]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            async with SessionLocal() as db:
+                tasks = await crud.create_tasks(db, [payload for payload, _ in batch])
+        except Exception:
+            # One bad row must not fail its neighbours: retry each item in its own transaction
+            log.exception("Batched insert of %d tasks failed; retrying individually", len(batch))
+            for payload, fut in batch:
+                try:
+                    async with SessionLocal() as db:
+                        task = await crud.create_task(db, payload)
+                except Exception as exc:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                else:
+                    if not fut.done():
+                        fut.set_result(task)
+            return
+        for (_, fut), task in zip(batch, tasks, strict=True):
+            if not fut.done():
+                fut.set_result(task)
+
+
+write_queue = WriteQueue(settings.write_batch_window_ms, settings.write_batch_max)
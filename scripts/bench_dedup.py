@@ -0,0 +1,65 @@
+"""
+Duplicate-lookup latency at ingest scale (in-memory index only, no DB).
+
+    python scripts/bench_dedup.py --tasks 100000 --queries 2000
+
+Titles are drawn from a Zipf-like vocabulary so a few words ("send", "report") are very
+common, as in real task lists. Prints p50/p99/max lookup time in microseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.dedup import DuplicateIndex  # noqa: E402
+
+COMMON = "send call email review update plan draft buy book schedule fix check report status team meeting".split()
+
+
+def make_title(rng: random.Random, vocab: list[str], weights: list[float]) -> str:
+    words = [rng.choice(COMMON)] + rng.choices(vocab, weights=weights, k=rng.randint(2, 6))
+    return " ".join(words)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tasks", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=2_000)
+    ap.add_argument("--vocab", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f"w{i}" for i in range(args.vocab)]
+    weights = [1 / (i + 1) for i in range(args.vocab)]
+    titles = [make_title(rng, vocab, weights) for _ in range(args.tasks)]
+
+    idx = DuplicateIndex(settings.dedup_max_candidates)
+    t = time.perf_counter()
+    for i, title in enumerate(titles):
+        idx.add(i, title)
+    print(f"indexed {len(idx)} open tasks in {time.perf_counter() - t:.2f}s")
+
+    # half near-duplicates of existing titles, half fresh titles
+    queries = [rng.choice(titles) + " asap" if i % 2 else make_title(rng, vocab, weights) for i in range(args.queries)]
+    samples = []
+    hits = 0
+    for q in queries:
+        t = time.perf_counter()
+        hits += bool(idx.query(q, settings.dedup_threshold, settings.dedup_max_results))
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+    p = lambda pct: samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]  # noqa: E731
+    print(f"{args.queries} lookups, {hits} with duplicates")
+    print(f"p50={p(50):.0f}us  p99={p(99):.0f}us  max={samples[-1]:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Throughput vs. uvicorn worker count on one machine (multi-worker mode, see app/coordination.py).
+
+For each worker count, starts `uvicorn --workers N` on a throwaway copy of a seeded SQLite
+file (schema via `python -m app.prestart`, coordination on), then drives a fixed mix of
+requests from several client processes for --duration seconds.
+
+    python scripts/bench_workers.py --workers 1 2 4 --duration 10
+    python scripts/bench_workers.py --mix read=80,list=10,create=10 --clients 64
+
+Mix entries: read = GET /tasks/{id}, list = GET /tasks?limit=50, create = POST /tasks,
+suggest = GET /suggestions. Prints requests/sec, p50/p99 latency and errors per worker
+count, plus the speedup over the first row.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env(db: Path) -> dict[str, str]:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{db}",
+        "SCHEMA_INIT_ON_STARTUP": "false",
+        "COORDINATION_ENABLED": "true",
+        "CAPTURE_ENABLED": "false",
+        "ADMISSION_ENABLED": "false",  # measure the workers, not the per-worker slot limits
+        "STATIC_PRECOMPRESS": "false",
+    }
+
+
+def seed(db: Path, tasks: int) -> None:
+    """Create the schema and `tasks` rows in `db` (once; each run gets a copy)."""
+    env = _env(db)
+    subprocess.run([sys.executable, "-m", "app.prestart"], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    rng = random.Random(1)
+    words = "send status report buy milk plan draft email call review budget team fix deploy".split()
+    with launched(db, 1) as url, httpx.Client(base_url=url, timeout=30) as client:
+        for i in range(tasks):
+            client.post("/tasks", json={"title": f"{' '.join(rng.choices(words, k=4))} {i}"}).raise_for_status()
+
+
+@contextmanager
+def launched(db: Path, workers: int):
+    port = _free_port()
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    cmd += ["--workers", str(workers), "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=_env(db), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not come up")
+            time.sleep(0.2)
+        # give every worker time to finish its lifespan before measuring
+        time.sleep(1.0 + 0.25 * workers)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    out = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        out.append((name.strip(), int(weight or 1)))
+    return out
+
+
+async def _drive(url: str, mix: list[tuple[str, int]], clients: int, duration: float, max_id: int, seed_: int):
+    rng = random.Random(seed_)
+    names = [n for n, _ in mix]
+    weights = [w for _, w in mix]
+    latencies: list[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+
+        async def one(n: int) -> None:
+            nonlocal errors
+            i = 0
+            while time.perf_counter() < stop_at:
+                op = rng.choices(names, weights)[0]
+                t = time.perf_counter()
+                try:
+                    if op == "read":
+                        r = await client.get(f"/tasks/{rng.randint(1, max_id)}")
+                    elif op == "list":
+                        r = await client.get("/tasks", params={"limit": 50})
+                    elif op == "create":
+                        r = await client.post("/tasks", json={"title": f"bench c{seed_}.{n} #{i}"})
+                    else:
+                        r = await client.get("/suggestions", params={"limit": 200, "budget_ms": 50})
+                    if r.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t)
+                i += 1
+
+        await asyncio.gather(*(one(n) for n in range(clients)))
+    return latencies, errors
+
+
+def _client_proc(args: tuple) -> tuple[list[float], int]:
+    return asyncio.run(_drive(*args))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, max(0, round(pct / 100 * (len(s) - 1))))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--clients", type=int, default=64, help="concurrent connections in total")
+    ap.add_argument("--client-procs", type=int, default=2, help="load generator processes")
+    ap.add_argument("--tasks", type=int, default=1000, help="rows seeded before the first run")
+    ap.add_argument("--mix", default="read=80,list=10,create=10")
+    args = ap.parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory(prefix="va-workers-") as tmp:
+        seed_db = Path(tmp) / "seed.sqlite"
+        seed(seed_db, args.tasks)
+        print(f"cpus={os.cpu_count()} clients={args.clients} procs={args.client_procs} mix={args.mix}")
+        print(f"{'workers':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'speedup':>8}")
+        base = 0.0
+        for n in args.workers:
+            db = Path(tmp) / f"run{n}.sqlite"
+            shutil.copyfile(seed_db, db)
+            with launched(db, n) as url:
+                per_proc = max(1, args.clients // args.client_procs)
+                jobs = [(url, mix, per_proc, args.duration, args.tasks, p) for p in range(args.client_procs)]
+                with mp.get_context("spawn").Pool(args.client_procs) as pool:
+                    results = pool.map(_client_proc, jobs)
+            latencies = [x for lat, _ in results for x in lat]
+            errors = sum(e for _, e in results)
+            rps = len(latencies) / args.duration
+            base = base or rps
+            print(
+                f"{n:>8} {rps:>9.0f} {percentile(latencies, 50) * 1000:>8.1f} "
+                f"{percentile(latencies, 99) * 1000:>8.1f} {errors:>7} {rps / base:>7.2f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""
+Task insert throughput: group-commit queue vs. one commit per task.
+
+Runs against a throwaway SQLite file so the real taskdb is never touched.
+
+    python scripts/bench_writes.py --per-client 200
+    SQLITE_SYNCHRONOUS=NORMAL WRITE_BATCH_WINDOW_MS=5 python scripts/bench_writes.py
+
+Prints inserts/sec at 1, 16 and 128 concurrent clients for both modes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="va-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{Path(_tmp) / 'bench.sqlite'}")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.schemas import TaskCreate  # noqa: E402
+from app.writer import WriteQueue  # noqa: E402
+
+
+async def _direct(payload: TaskCreate) -> None:
+    async with SessionLocal() as db:
+        await crud.create_task(db, payload)
+
+
+async def _run(mode: str, clients: int, per_client: int) -> tuple[float, int]:
+    queue = WriteQueue(settings.write_batch_window_ms, settings.write_batch_max)
+    if mode == "batched":
+        await queue.start()
+
+    errors = 0
+
+    async def client(n: int) -> None:
+        nonlocal errors
+        for i in range(per_client):
+            payload = TaskCreate(title=f"bench {mode} c{n} #{i}")
+            try:
+                if mode == "batched":
+                    await queue.submit(payload)
+                else:
+                    await _direct(payload)
+            except OperationalError:  # "database is locked" under writer contention
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    return (clients * per_client - errors) / elapsed, errors
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 16, 128])
+    ap.add_argument("--per-client", type=int, default=100)
+    args = ap.parse_args()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(
+        f"journal_mode={settings.sqlite_journal_mode} synchronous={settings.sqlite_synchronous} "
+        f"window_ms={settings.write_batch_window_ms} max_batch={settings.write_batch_max}"
+    )
+    print(f"{'clients':>8} {'direct/s':>10} {'errors':>7} {'batched/s':>10} {'errors':>7} {'speedup':>8}")
+    for n in args.clients:
+        # keep total work roughly constant so 128 clients does not take forever in direct mode
+        per_client = max(1, args.per_client * 16 // max(n, 16)) if n > 16 else args.per_client
+        direct, d_err = await _run("direct", n, per_client)
+        batched, b_err = await _run("batched", n, per_client)
+        print(f"{n:>8} {direct:>10.0f} {d_err:>7} {batched:>10.0f} {b_err:>7} {batched / max(direct, 1e-9):>7.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
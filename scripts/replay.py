@@ -0,0 +1,222 @@
+"""
+Replay a traffic capture (see app/capture.py) and compare builds.
+
+    # replay against a running instance at 2x the original pace
+    python scripts/replay.py run captures/traffic.jsonl --url http://127.0.0.1:8000 --speed 2 --out a.jsonl
+
+    # start a local uvicorn on a fresh copy of a seed DB, replay back-to-back, stop it
+    python scripts/replay.py run captures/traffic.jsonl* --launch --seed-db seed.sqlite --speed 0 --out b.jsonl
+
+    # latency distribution + status/error differences between two runs
+    python scripts/replay.py compare a.jsonl b.jsonl
+
+Requests are sent in capture order, each one released at its recorded offset divided by
+--speed (0 = no pacing, one request at a time), so two runs of the same capture issue the
+same request sequence.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_of(method: str, path: str) -> str:
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+def load_capture(paths: list[str]) -> list[dict]:
+    """Read one or more capture files (rotated files included) and order by start time."""
+    records: list[dict] = []
+    for p in paths:
+        with open(p, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, round(pct / 100 * (len(s) - 1))))
+    return s[k]
+
+
+async def replay(records: list[dict], base_url: str, speed: float, concurrency: int) -> list[dict]:
+    if not records:
+        return []
+    t0 = records[0]["t"]
+    # speed 0: strictly one request after another, so ordering (and created ids) is reproducible
+    sem = asyncio.Semaphore(concurrency if speed > 0 else 1)
+    results: list[dict[str, Any]] = [{} for _ in records]
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        start = time.perf_counter()
+
+        async def fire(i: int, rec: dict) -> None:
+            if speed > 0:
+                delay = (rec["t"] - t0) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            url = rec["path"] + (f"?{rec['query']}" if rec.get("query") else "")
+            out: dict[str, Any] = {"i": i, "route": route_of(rec["method"], rec["path"]), "recorded": rec["status"]}
+            async with sem:
+                t = time.perf_counter()
+                try:
+                    r = await client.request(rec["method"], url, json=rec.get("body"))
+                    out["status"] = r.status_code
+                except httpx.HTTPError as exc:
+                    out["status"] = None
+                    out["error"] = exc.__class__.__name__
+                out["latency_ms"] = round((time.perf_counter() - t) * 1000, 3)
+            results[i] = out
+
+        await asyncio.gather(*(fire(i, rec) for i, rec in enumerate(records)))
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def launched(seed_db: str | None):
+    """Run uvicorn on a throwaway copy of `seed_db` (or an empty DB)."""
+    with tempfile.TemporaryDirectory(prefix="va-replay-") as tmp:
+        db = Path(tmp) / "replay.sqlite"
+        if seed_db:
+            shutil.copyfile(seed_db, db)
+        port = _free_port()
+        env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{db}", "CAPTURE_ENABLED": "false"}
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not come up")
+                time.sleep(0.2)
+            yield url
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def summarize(results: list[dict]) -> dict[str, dict]:
+    by_route: dict[str, list[dict]] = {}
+    for r in results:
+        by_route.setdefault(r["route"], []).append(r)
+    out: dict[str, dict] = {}
+    for route, rows in sorted(by_route.items()):
+        lat = [r["latency_ms"] for r in rows]
+        out[route] = {
+            "n": len(rows),
+            "p50": percentile(lat, 50),
+            "p95": percentile(lat, 95),
+            "p99": percentile(lat, 99),
+            "errors": sum(1 for r in rows if r.get("status") is None or r["status"] >= 500),
+        }
+    return out
+
+
+def print_summary(summary: dict[str, dict]) -> None:
+    print(f"{'route':<34} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, s in summary.items():
+        print(f"{route:<34} {s['n']:>6} {s['p50']:>9.2f} {s['p95']:>9.2f} {s['p99']:>9.2f} {s['errors']:>7}")
+
+
+def load_results(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(a_path: str, b_path: str, limit: int) -> int:
+    a, b = load_results(a_path), load_results(b_path)
+    sa, sb = summarize(a), summarize(b)
+    print(f"{'route':<34} {'p50 A':>8} {'p50 B':>8} {'p95 A':>8} {'p95 B':>8} {'p95 Δ%':>8} {'err A':>6} {'err B':>6}")
+    for route in sorted(set(sa) | set(sb)):
+        x, y = sa.get(route), sb.get(route)
+        if not x or not y:
+            print(f"{route:<34} only in {'A' if x else 'B'}")
+            continue
+        delta = (y["p95"] - x["p95"]) / x["p95"] * 100 if x["p95"] else 0.0
+        print(
+            f"{route:<34} {x['p50']:>8.2f} {y['p50']:>8.2f} {x['p95']:>8.2f} {y['p95']:>8.2f} "
+            f"{delta:>+7.1f}% {x['errors']:>6} {y['errors']:>6}"
+        )
+
+    diffs = [(ra, rb) for ra, rb in zip(a, b, strict=False) if ra.get("status") != rb.get("status")]
+    if len(a) != len(b):
+        print(f"\nrun lengths differ: A={len(a)} B={len(b)}")
+    print(f"\n{len(diffs)} request(s) with a different status")
+    for ra, rb in diffs[:limit]:
+        print(f"  #{ra['i']:<6} {ra['route']:<34} A={ra.get('status')} B={rb.get('status')}")
+    return 1 if diffs else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="replay a capture")
+    run.add_argument("capture", nargs="+")
+    target = run.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url")
+    target.add_argument("--launch", action="store_true", help="start a local uvicorn on a fresh DB")
+    run.add_argument("--seed-db", help="SQLite file copied as the starting DB (with --launch)")
+    run.add_argument("--speed", type=float, default=1.0, help="pace multiplier; 0 = back-to-back, one at a time")
+    run.add_argument("--concurrency", type=int, default=64)
+    run.add_argument("--out", help="write per-request results as JSONL")
+
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("a")
+    cmp_.add_argument("b")
+    cmp_.add_argument("--limit", type=int, default=20)
+
+    args = ap.parse_args(argv)
+    if args.cmd == "compare":
+        return compare(args.a, args.b, args.limit)
+
+    records = load_capture(args.capture)
+    if args.launch:
+        with launched(args.seed_db) as url:
+            results = asyncio.run(replay(records, url, args.speed, args.concurrency))
+    else:
+        results = asyncio.run(replay(records, args.url, args.speed, args.concurrency))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    print_summary(summarize(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
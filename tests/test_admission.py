@@ -0,0 +1,42 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.admission import RouteLimiter, rules
+from app.main import app
+
+
+def test_limiter_queues_then_rejects_when_full():
+    async def run():
+        lim = RouteLimiter("t", max_concurrent=1, max_queue=1, queue_timeout_s=1.0)
+        assert await lim.acquire()
+        waiter = asyncio.create_task(lim.acquire())
+        await asyncio.sleep(0)
+        assert lim.queued == 1
+        assert not await lim.acquire()  # queue full -> fast reject
+        lim.release()  # slot handed to the waiter
+        assert await waiter
+        lim.release()
+        return lim.stats()
+
+    stats = asyncio.run(run())
+    assert stats["active"] == 0
+    assert stats["admitted"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_saturated_ingest_is_rejected_but_cheap_reads_pass(monkeypatch):
+    ingest = next(r.limiter for r in rules if r.path == "/ingest")
+    monkeypatch.setattr(ingest, "max_concurrent", 0)
+    monkeypatch.setattr(ingest, "max_queue", 0)
+    with TestClient(app) as client:
+        r = client.post("/ingest", json={"text": "Buy milk"})
+        assert r.status_code == 503
+        assert r.headers["retry-after"]
+
+        assert client.get("/health").status_code == 200
+        created = client.post("/tasks", json={"title": "Still writable"}).json()
+        assert client.get(f"/tasks/{created['id']}").status_code == 200
+
+        stats = client.get("/health/admission").json()
+        assert stats["ingest"]["rejected"] >= 1
@@ -0,0 +1,25 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+
+def test_capture_records_sanitized_requests(tmp_path, monkeypatch):
+    path = tmp_path / "traffic.jsonl"
+    monkeypatch.setattr(settings, "capture_enabled", True)
+    monkeypatch.setattr(settings, "capture_path", str(path))
+    with TestClient(app) as client:
+        assert client.post("/tasks", json={"title": "Captured", "token": "s3cret"}).status_code == 200
+        assert client.get("/tasks", params={"limit": 5}).status_code == 200
+        assert client.get("/tasks", params={"limit": 5, "api_key": "k3y"}).status_code == 200
+        assert client.get("/health").status_code == 200  # excluded path
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["method"], r["path"]) for r in lines] == [("POST", "/tasks"), ("GET", "/tasks"), ("GET", "/tasks")]
+    post, get, get_with_key = lines
+    assert post["body"] == {"title": "Captured", "token": "[REDACTED]"}
+    assert post["status"] == 200 and post["duration_ms"] >= 0
+    assert get["query"] == "limit=5" and get["body"] is None
+    assert get_with_key["query"] == "limit=5&api_key=[REDACTED]"
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_large_api_responses_are_gzipped():
+    with TestClient(app) as client:
+        for i in range(30):
+            assert client.post("/tasks", json={"title": f"Compressible task number {i}"}).status_code == 200
+        r = client.get("/tasks", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in r.headers["vary"].lower()
+        assert isinstance(r.json(), list)
+
+        small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+
+def test_static_ui_is_precompressed_and_revalidates():
+    with TestClient(app) as client:
+        r = client.get("/ui/", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.headers["cache-control"] == "no-cache"
+        assert "<html" in r.text.lower()
+
+        etag = r.headers["etag"]
+        r = client.get("/ui/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert r.status_code == 304
+
+        plain = client.get("/ui/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["etag"] != etag
@@ -0,0 +1,220 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import coordination, crud
+from app.backup import create_backup, restore_backup
+from app.cache import task_cache
+from app.coordination import ChangePoller
+from app.db import Base, SessionLocal, engine
+from app.dedup import dedup_index
+from app.models import ChangeLog, Task
+from app.prestart import init_schema
+from app.rejections import rejections
+from app.schemas import TaskCreate, TaskUpdate
+from app.utils.ids import title_fingerprint
+
+
+def _word() -> str:
+    return uuid.uuid4().hex[:10].translate(str.maketrans("0123456789", "ghijklmnop"))
+
+
+@pytest.fixture
+def scratch_db(monkeypatch, tmp_path):
+    """
+    A throwaway database behind the poller, for tests that restore over it (never the
+    configured one). Yields its path and a session factory bound to it.
+    """
+    path = tmp_path / "scratch.sqlite"
+    scratch = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    sessions = async_sessionmaker(bind=scratch, expire_on_commit=False)
+    monkeypatch.setattr(coordination, "engine", scratch)
+    monkeypatch.setattr(coordination, "SessionLocal", sessions)
+
+    async def create():
+        async with scratch.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await scratch.dispose()
+
+    asyncio.run(create())
+    yield path, sessions
+    asyncio.run(scratch.dispose())
+
+
+def test_prestart_is_idempotent_under_concurrency():
+    async def run():
+        try:
+            await asyncio.gather(*(init_schema() for _ in range(4)))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_poller_applies_writes_from_other_processes(monkeypatch):
+    old_title = " ".join(_word() for _ in range(3))
+    new_title = " ".join(_word() for _ in range(3))
+
+    async def remote(fn):
+        # Write as another worker would: straight to the DB, tagged with a foreign origin
+        with monkeypatch.context() as m:
+            m.setattr(coordination, "origin", lambda: "other-host:1")
+            async with SessionLocal() as db:
+                await fn(db)
+                await db.commit()
+
+    async def run():
+        await init_schema()
+        poller = ChangePoller(poll_ms=10, retention_s=3600)
+        await poller.mark()
+        try:
+            async with SessionLocal() as db:
+                task = await crud.create_task(db, TaskCreate(title=old_title))
+            assert await poller.poll() == 0  # own writes are already applied locally
+            task_cache.fill(task.id, b"stale", task_cache.token())
+
+            async def retitle(db):
+                t = await db.get(Task, task.id)
+                t.title = new_title
+
+            await remote(retitle)
+            assert await poller.poll() == 1
+            assert task_cache.get(task.id) is None
+            assert [m.id for m in dedup_index.query(new_title, 0.9, 3)] == [task.id]
+            assert dedup_index.query(old_title, 0.9, 3) == []
+
+            async def remove(db):
+                await db.delete(await db.get(Task, task.id))
+
+            await remote(remove)
+            assert await poller.poll() == 1
+            assert dedup_index.query(new_title, 0.9, 3) == []
+
+            async with SessionLocal() as db:
+                kinds = (await db.scalars(select(ChangeLog.kind).where(ChangeLog.task_id == task.id))).all()
+            assert kinds == ["task", "task", "delete"]
+        finally:
+            await poller.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_remote_feedback_refreshes_only_the_touched_tasks(monkeypatch):
+    titles = [" ".join(_word() for _ in range(3)) for _ in range(2)]
+
+    async def full_load(db):
+        raise AssertionError("remote feedback must not rebuild the whole store")
+
+    async def run():
+        await init_schema()
+        poller = ChangePoller(poll_ms=10, retention_s=3600)
+        await poller.mark()
+        mark = poller.last_id
+        try:
+            async with SessionLocal() as db:
+                a = await crud.create_task(db, TaskCreate(title=titles[0]))
+                b = await crud.create_task(db, TaskCreate(title=titles[1]))
+            entry = {
+                "event": "suggestion_feedback",
+                "id": f"combine:{a.id}:{b.id}",
+                "type": "combine",
+                "accepted": False,
+                "timestamp": "2026-01-01T00:00:00+00:00",
+                "title_fps": {str(t.id): title_fingerprint(t.title) for t in (a, b)},
+            }
+            with monkeypatch.context() as m:
+                m.setattr(coordination, "origin", lambda: "other-host:1")
+                async with SessionLocal() as db:
+                    for tid in (a.id, b.id):
+                        t = await db.get(Task, tid)
+                        t.history = [*(t.history or []), entry]
+                    await db.commit()
+
+            monkeypatch.setattr(rejections, "load", full_load)
+            assert await poller.poll() == 2
+            assert rejections.snapshot().pair_rejected(a.id, titles[0], b.id, titles[1])
+            async with SessionLocal() as db:
+                rows = select(ChangeLog.kind).where(ChangeLog.task_id == a.id, ChangeLog.id > mark)
+                kinds = (await db.scalars(rows)).all()
+            assert kinds == ["task", "feedback"]
+        finally:
+            await poller.stop()
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_poller_reloads_after_a_restore(monkeypatch, scratch_db, tmp_path):
+    path, sessions = scratch_db
+    title = " ".join(_word() for _ in range(3))
+    later = " ".join(_word() for _ in range(3))
+
+    async def run():
+        poller = ChangePoller(poll_ms=10, retention_s=3600)
+        await poller.mark()
+        try:
+            async with sessions() as db:
+                task = await crud.create_task(db, TaskCreate(title=title))
+            snapshot = await asyncio.to_thread(create_backup, tmp_path / "backups", False, 0, path)
+            async with sessions() as db:
+                await crud.update_task(db, task.id, TaskUpdate(title=later))
+            await poller.poll()
+            high = poller.last_id
+
+            # Restore rolls the title and change_log ids back below this worker's mark
+            await asyncio.to_thread(restore_backup, snapshot.path, path, False)
+            assert await poller.poll() == 0
+            assert poller.resets == 1 and poller.last_id < high
+            assert [m.id for m in dedup_index.query(title, 0.9, 3)] == [task.id]
+            assert dedup_index.query(later, 0.9, 3) == []
+
+            # Changes after the restore are picked up again
+            with monkeypatch.context() as m:
+                m.setattr(coordination, "origin", lambda: "other-host:1")
+                async with sessions() as db:
+                    t = await db.get(Task, task.id)
+                    t.title = later
+                    await db.commit()
+            assert await poller.poll() == 1
+            assert [m.id for m in dedup_index.query(later, 0.9, 3)] == [task.id]
+        finally:
+            await poller.stop()
+            await coordination.engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_restore_is_noticed_without_coordination(scratch_db, tmp_path):
+    path, sessions = scratch_db
+    title = " ".join(_word() for _ in range(3))
+    later = " ".join(_word() for _ in range(3))
+
+    async def run():
+        poller = ChangePoller(poll_ms=10, retention_s=3600, coordinate=False)
+        await poller.mark()
+        try:
+            async with sessions() as db:
+                task = await crud.create_task(db, TaskCreate(title=title))
+            snapshot = await asyncio.to_thread(create_backup, tmp_path / "backups", False, 0, path)
+            async with sessions() as db:
+                await crud.update_task(db, task.id, TaskUpdate(title=later))
+            task_cache.fill(task.id, b"later", task_cache.token())
+            assert await poller.poll() == 0 and poller.resets == 0
+
+            await asyncio.to_thread(restore_backup, snapshot.path, path, False)
+            await poller.poll()
+            assert poller.resets == 1
+            assert task_cache.get(task.id) is None
+            assert [m.id for m in dedup_index.query(title, 0.9, 3)] == [task.id]
+            assert dedup_index.query(later, 0.9, 3) == []
+            async with sessions() as db:
+                assert (await db.scalar(select(func.count()).select_from(ChangeLog))) == 0
+        finally:
+            await poller.stop()
+            await coordination.engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.dedup import DuplicateIndex
+from app.main import app
+
+
+def _word() -> str:
+    # letters only, so dateparser never mistakes it for a date on /ingest
+    return uuid.uuid4().hex[:10].translate(str.maketrans("0123456789", "ghijklmnop"))
+
+
+def test_index_finds_similar_titles_and_tracks_removals():
+    idx = DuplicateIndex()
+    idx.add(1, "Send status report")
+    idx.add(2, "Buy milk")
+    idx.add(3, "Send weekly status report to Alice")
+    assert [m.id for m in idx.query("send the status report", threshold=0.6, limit=3)] == [1, 3]
+    assert [m.id for m in idx.query("send the status report", threshold=0.8, limit=3)] == [1]
+    idx.add(1, "Call the bank")  # retitled
+    assert [m.id for m in idx.query("send the status report", threshold=0.6, limit=3)] == [3]
+    idx.remove(2)
+    assert idx.query("Buy milk", threshold=0.6, limit=3) == []
+
+
+def test_capture_reports_duplicates_and_can_merge():
+    title = " ".join(_word() for _ in range(3))
+    with TestClient(app) as client:
+        first = client.post("/tasks", json={"title": title}).json()
+        assert first["duplicates"] == [] and first["merged"] is False
+
+        r = client.post("/ingest", json={"text": f"{title} asap #Acme", "channel": "email"})
+        assert r.status_code == 200, r.text
+        second = r.json()
+        assert second["id"] != first["id"]
+        assert [d["id"] for d in second["duplicates"]] == [first["id"]]
+
+        r = client.post("/tasks", params={"merge": True}, json={"title": title, "people": ["Joel"]})
+        merged = r.json()
+        assert merged["merged"] is True and merged["id"] == first["id"]
+        assert merged["people"] == ["Joel"]
+        assert merged["history"][-1]["event"] == "duplicate_merged"
+
+        # closed / deleted tasks leave the index
+        client.patch(f"/tasks/{first['id']}", json={"status": "done"})
+        client.delete(f"/tasks/{second['id']}")
+        assert client.post("/tasks", json={"title": title}).json()["duplicates"] == []
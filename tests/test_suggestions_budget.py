@@ -0,0 +1,81 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import suggestions as sug
+from app.utils.similarity import cosine_similarity
+from app.utils.text import tokenize
+
+
+def _exhaustive_pairs(docs, threshold):
+    toks = [tokenize(d.title) for d in docs]
+    pairs = []
+    for i in range(len(docs)):
+        for j in range(i + 1, len(docs)):
+            s = sug._clamp01(cosine_similarity(toks[i], toks[j]))
+            if s >= threshold:
+                pairs.append((s, i, j))
+    pairs.sort(key=lambda x: x[0], reverse=True)
+    return pairs
+
+
+def test_anytime_scoring_matches_exhaustive_scan_when_complete():
+    rng = random.Random(7)
+    words = "send status report buy milk plan draft email call review budget team".split()
+    docs = [sug.Doc(i, " ".join(rng.choices(words, k=rng.randint(1, 5)))) for i in range(120)]
+    for threshold in (0.0, 0.3, 0.6):
+        pairs, complete = sug._score_combine_pairs(docs, threshold)
+        assert complete
+        assert pairs == _exhaustive_pairs(docs, threshold)
+
+
+def test_pair_budget_stops_scoring():
+    words = "send status report buy milk plan".split()
+    rng = random.Random(3)
+    docs = [sug.Doc(i, " ".join(rng.choices(words, k=3))) for i in range(200)]
+    pairs, complete = sug._score_combine_pairs(docs, 0.0, max_pairs=100)
+    assert not complete
+    assert len(pairs) == 100
+
+
+def test_expired_budget_returns_partial_then_refined(monkeypatch):
+    with TestClient(app) as client:
+        for title in ["Send weekly status report to Alice", "Send status report", "Buy milk", "Buy whole milk"]:
+            assert client.post("/tasks", json={"title": title}).status_code == 200
+
+        sug._refined.clear()
+        # A clock that jumps 10s per read: the 1 ms budget is spent before the first pair is scored
+        ticks = itertools.count(step=10.0)
+        monkeypatch.setattr(sug, "time", SimpleNamespace(monotonic=lambda: next(ticks)))
+        r = client.get("/suggestions", params={"threshold": 0.3, "budget_ms": 1})
+        assert r.status_code == 200
+        assert r.headers["x-suggestions-partial"] == "true"
+
+        sug._refine_pool.submit(lambda: None).result()  # single worker: waits for the refinement
+        r = client.get("/suggestions", params={"threshold": 0.3, "budget_ms": 1})
+        assert r.headers["x-suggestions-partial"] == "false"
+        assert any(s["type"] == "combine" for s in r.json())
+
+
+def test_capped_refinement_stays_partial(monkeypatch):
+    with TestClient(app) as client:
+        for title in ["Send weekly status report to Alice", "Send status report", "Buy milk", "Buy whole milk"]:
+            assert client.post("/tasks", json={"title": title}).status_code == 200
+
+        sug._refined.clear()
+        monkeypatch.setattr(sug, "_REFINE_MAX_PAIRS", 1)
+        ticks = itertools.count(step=10.0)
+        monkeypatch.setattr(sug, "time", SimpleNamespace(monotonic=lambda: next(ticks)))
+        params = {"threshold": 0.3, "limit": 50, "budget_ms": 1}
+        assert client.get("/suggestions", params=params).headers["x-suggestions-partial"] == "true"
+
+        sug._refine_pool.submit(lambda: None).result()
+        # the refinement hit its pair cap: served from cache, still reported as partial
+        assert client.get("/suggestions", params=params).headers["x-suggestions-partial"] == "true"
+
+        # without a budget the full answer is computed
+        del params["budget_ms"]
+        assert client.get("/suggestions", params=params).headers["x-suggestions-partial"] == "false"
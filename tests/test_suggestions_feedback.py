@@ -1,3 +1,5 @@
+import uuid
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -45,3 +47,68 @@ def test_feedback_records_history():
         assert r.status_code == 200
         hist = r.json().get("history")
         assert isinstance(hist, list) and any(h.get("id") == combo["id"] for h in hist)
+
+
+def _word() -> str:
+    return uuid.uuid4().hex[:10].translate(str.maketrans("0123456789", "ghijklmnop"))
+
+
+def _combine_for(client: TestClient, ids: set[int]):
+    # limit=2: only the two tasks this test just created
+    r = client.get("/suggestions", params={"threshold": 0.8, "limit": 2, "include_split": False})
+    assert r.status_code == 200
+    return next((s for s in r.json() if set(s["task_ids"]) == ids), None)
+
+
+def test_rejected_combine_is_not_reoffered_until_a_title_changes():
+    words = [_word() for _ in range(3)]
+    with TestClient(app) as client:
+        a = client.post("/tasks", json={"title": " ".join(words)}).json()["id"]
+        b = client.post("/tasks", json={"title": " ".join(words) + "!"}).json()["id"]
+        combo = _combine_for(client, {a, b})
+        assert combo is not None
+
+        fb = {"id": combo["id"], "type": "combine", "accepted": False, "task_ids": [a, b]}
+        assert client.post("/suggestions/feedback", json=fb).status_code == 200
+        assert _combine_for(client, {a, b}) is None
+
+    # Rebuilt from task history on startup
+    with TestClient(app) as client:
+        assert _combine_for(client, {a, b}) is None
+        r = client.patch(f"/tasks/{b}", json={"title": " ".join(words) + " " + _word()})
+        assert r.status_code == 200
+        assert _combine_for(client, {a, b}) is not None
+
+
+def test_rejected_split_is_suppressed():
+    title = f"{_word()} the {_word()}, {_word()} and {_word()}"
+    with TestClient(app) as client:
+        tid = client.post("/tasks", json={"title": title}).json()["id"]
+
+        def split_for():
+            r = client.get("/suggestions", params={"threshold": 1.0, "limit": 2})
+            return next((s for s in r.json() if s.get("task_id") == tid), None)
+
+        split = split_for()
+        assert split is not None
+        fb = {"id": split["id"], "type": "split", "accepted": False, "task_id": tid}
+        assert client.post("/suggestions/feedback", json=fb).status_code == 200
+        assert split_for() is None
+
+
+def test_second_feedback_on_a_task_is_persisted():
+    words = [_word() for _ in range(3)]
+    with TestClient(app) as client:
+        a = client.post("/tasks", json={"title": " ".join(words)}).json()["id"]
+        b = client.post("/tasks", json={"title": " ".join(words) + "!"}).json()["id"]
+        combo = _combine_for(client, {a, b})
+        assert combo is not None
+        for accepted in (True, False):
+            fb = {"id": combo["id"], "type": "combine", "accepted": accepted, "task_ids": [a, b]}
+            assert client.post("/suggestions/feedback", json=fb).status_code == 200
+
+    with TestClient(app) as client:
+        for tid in (a, b):
+            hist = client.get(f"/tasks/{tid}").json()["history"]
+            assert [h["accepted"] for h in hist if h["event"] == "suggestion_feedback"] == [True, False]
+        assert _combine_for(client, {a, b}) is None
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+from app.cache import MemoryLRUCache, TaskCache
+from app.main import app
+
+
+def test_memory_lru_is_bounded_by_entries_and_bytes():
+    c = MemoryLRUCache(max_entries=2, max_bytes=10, ttl_s=0)
+    c.set("a", b"1234")
+    c.set("b", b"1234")
+    assert c.get("a") == b"1234"  # a is now most recent
+    c.set("c", b"1234")  # over max_entries: evicts b
+    assert c.get("b") is None
+    c.set("d", b"123456")  # over max_bytes: evicts until it fits
+    assert c.stats()["bytes"] <= 10
+    assert c.stats()["evictions"] == 2
+
+
+def test_fill_after_invalidation_is_dropped():
+    tc = TaskCache(MemoryLRUCache(10, 1000, 0))
+    token = tc.token()
+    tc.invalidate(1)  # a write lands while the reader is still loading
+    tc.fill(1, b"stale", token)
+    assert tc.get(1) is None
+
+
+def test_get_task_is_cached_and_writes_invalidate():
+    with TestClient(app) as client:
+        tid = client.post("/tasks", json={"title": "Cache me"}).json()["id"]
+        before = client.get("/health/cache").json()
+
+        assert client.get(f"/tasks/{tid}").json()["title"] == "Cache me"
+        assert client.get(f"/tasks/{tid}").json()["title"] == "Cache me"
+        after = client.get("/health/cache").json()
+        assert after["hits"] >= before["hits"] + 1
+
+        client.patch(f"/tasks/{tid}", json={"title": "Cache me again"})
+        assert client.get(f"/tasks/{tid}").json()["title"] == "Cache me again"
+
+        client.delete(f"/tasks/{tid}")
+        assert client.get(f"/tasks/{tid}").status_code == 404
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import TaskFieldsOut, TaskOut
+
+
+def test_sparse_fieldsets_on_list_and_get():
+    with TestClient(app) as client:
+        r = client.post("/tasks", json={"title": "Sparse fields", "notes": "long notes body"})
+        assert r.status_code == 200
+        tid = r.json()["id"]
+
+        r = client.get("/tasks", params={"fields": "id,title,status,due", "limit": 1000})
+        assert r.status_code == 200
+        item = next(t for t in r.json() if t["id"] == tid)
+        assert set(item) == {"id", "title", "status", "due"}
+        assert item["status"] == "inbox"
+
+        # heavy columns are deferred from list pages by default
+        item = next(t for t in client.get("/tasks", params={"limit": 1000}).json() if t["id"] == tid)
+        assert "notes" not in item and "history" not in item
+        assert item["title"] == "Sparse fields"
+
+        r = client.get(f"/tasks/{tid}", params={"fields": "title,notes"})
+        assert r.json() == {"title": "Sparse fields", "notes": "long notes body"}
+
+        full = client.get(f"/tasks/{tid}").json()
+        assert full["notes"] == "long notes body" and "history" in full
+
+        assert client.get("/tasks", params={"fields": "id,bogus"}).status_code == 400
+
+
+def test_sparse_view_mirrors_task_out():
+    assert set(TaskFieldsOut.model_fields) == set(TaskOut.model_fields)
+    assert all(not f.is_required() for f in TaskFieldsOut.model_fields.values())
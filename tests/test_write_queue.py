@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.db import Base, engine
+from app.main import app
+from app.schemas import TaskCreate
+from app.writer import WriteQueue
+
+
+def test_concurrent_creates_are_batched_and_get_own_ids():
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        queue = WriteQueue(window_ms=20, max_batch=64)
+        await queue.start()
+        try:
+            titles = [f"Batched task {i}" for i in range(20)]
+            tasks = await asyncio.gather(*(queue.submit(TaskCreate(title=t)) for t in titles))
+        finally:
+            await queue.stop()
+            await engine.dispose()
+        return queue, titles, tasks
+
+    queue, titles, tasks = asyncio.run(run())
+    assert [t.title for t in tasks] == titles
+    assert len({t.id for t in tasks}) == len(tasks)
+    assert all(t.created_at is not None for t in tasks)
+    assert queue.batches < len(tasks)
+
+
+def test_post_task_through_queue_round_trips():
+    with TestClient(app) as client:
+        r = client.post("/tasks", json={"title": "Queued write"})
+        assert r.status_code == 200, r.text
+        created = r.json()
+        r = client.get(f"/tasks/{created['id']}")
+        assert r.status_code == 200
+        assert r.json()["title"] == "Queued write"